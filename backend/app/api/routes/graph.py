@@ -8,6 +8,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
+from app.api.routes.query import invalidate_rag_caches
 from app.graph.dynamic_repository import DynamicGraphRepository
 from app.graph.queries import QueryTemplates
 from app.core.neo4j_client import get_neo4j_client
@@ -255,6 +256,7 @@ async def delete_entity(entity_type: str, entity_id: str):
     
     try:
         result = await repo.delete_entity(entity_type, entity_id)
+        invalidate_rag_caches()
         return {
             "message": f"{entity_type} {entity_id} deleted",
             "deleted": result,
@@ -278,6 +280,7 @@ async def clear_graph():
     
     try:
         result = await repo.clear_all()
+        invalidate_rag_caches()
         return {
             "message": "Graph cleared",
             "deleted": result,
@@ -14,7 +14,7 @@ from pydantic import BaseModel
 
 from app.config import settings
 from app.core.neo4j_client import get_neo4j_client
-from app.core.llm import get_llm_client
+from app.core.llm import get_llm_client, get_extraction_client
 from app.schema.loader import get_schema_loader
 
 logger = logging.getLogger(__name__)
@@ -42,6 +42,7 @@ class HealthResponse(BaseModel):
     version: str
     services: dict[str, ServiceHealth]
     active_schema: Optional[dict] = None
+    model_loaded: bool = False
 
 
 class ReadinessResponse(BaseModel):
@@ -111,6 +112,7 @@ async def health_check():
         version="0.1.0",
         services=services,
         active_schema=schema_info,
+        model_loaded=get_extraction_client().model_loaded,
     )
 
 
@@ -208,6 +210,7 @@ async def llm_health():
         "model": settings.default_llm_model,
         "extraction_model": settings.extraction_model,
         "rag_model": settings.rag_model,
+        "model_loaded": get_extraction_client().model_loaded,
     }
 
 
@@ -226,10 +229,15 @@ async def config_check():
         "extraction_model": settings.extraction_model,
         "extraction_temperature": settings.extraction_temperature,
         "extraction_max_tokens": settings.extraction_max_tokens,
+        "extraction_warmup": settings.extraction_warmup,
         "rag_model": settings.rag_model,
         "rag_temperature": settings.rag_temperature,
         "rag_max_tokens": settings.rag_max_tokens,
         "rag_max_conversation_history": settings.rag_max_conversation_history,
+        "rag_generation_timeout": settings.rag_generation_timeout,
+        "rag_generation_retries": settings.rag_generation_retries,
+        "rag_answer_cache_ttl": settings.rag_answer_cache_ttl,
+        "rag_retrieval_cache_ttl": settings.rag_retrieval_cache_ttl,
         "chunk_size": settings.chunk_size,
         "chunk_overlap": settings.chunk_overlap,
         "default_strategy_preset": settings.default_strategy_preset,
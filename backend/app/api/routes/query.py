@@ -3,9 +3,11 @@ Query API routes for RAG.
 """
 
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+import orjson
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.rag.pipeline import RAGPipeline
@@ -26,6 +28,12 @@ def get_rag_pipeline() -> RAGPipeline:
     return _pipeline
 
 
+def invalidate_rag_caches(document_id: Optional[str] = None) -> None:
+    """Drop cached RAG results after the graph has changed."""
+    if _pipeline is not None:
+        _pipeline.invalidate_document(document_id)
+
+
 class QueryRequest(BaseModel):
     """Request for a RAG query."""
     question: str = Field(..., min_length=3, description="The question to ask")
@@ -34,6 +42,7 @@ class QueryRequest(BaseModel):
     contract_id: Optional[str] = Field(None, description="Deprecated: use document_id instead")
     include_follow_ups: bool = Field(True, description="Generate follow-up questions")
     use_history: bool = Field(True, description="Consider conversation history")
+    include_debug: bool = Field(True, description="Include Cypher queries and raw retrieval results")
     
     @property
     def target_document_id(self) -> Optional[str]:
@@ -94,6 +103,7 @@ async def ask_question(request: QueryRequest):
             document_id=request.target_document_id,
             include_follow_ups=request.include_follow_ups,
             use_conversation_history=request.use_history,
+            include_debug=request.include_debug,
         )
         
         return QueryResponse(
@@ -118,6 +128,34 @@ async def ask_question(request: QueryRequest):
         )
 
 
+@router.post("/ask/stream")
+async def ask_question_stream(request: QueryRequest):
+    """
+    Ask a question, streaming the answer as it is generated.
+    
+    Returns newline-delimited JSON events: {"type": "token", "data": ...}
+    for each answer fragment, then {"type": "done", "data": ...} with the
+    full response (answer, sources, follow-ups, metadata), or
+    {"type": "error", "data": ...} if generation fails.
+    """
+    pipeline = get_rag_pipeline()
+    
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for event in pipeline.query_stream(
+                question=request.question,
+                document_id=request.target_document_id,
+                include_follow_ups=request.include_follow_ups,
+                use_conversation_history=request.use_history,
+            ):
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            logger.error(f"Streamed query failed: {e}")
+            yield orjson.dumps({"type": "error", "data": f"Query failed: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.post("/summarize")
 async def summarize_document(request: SummaryRequest):
     """
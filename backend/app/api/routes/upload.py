@@ -9,6 +9,7 @@ from typing import Optional
 from fastapi import APIRouter, File, UploadFile, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 
+from app.api.routes.query import invalidate_rag_caches
 from app.config import settings
 from app.ingestion.pipeline import IngestionPipeline, IngestionResult
 
@@ -96,6 +97,7 @@ async def upload_document(
                 filename=file.filename,
                 store_in_graph=True,
             )
+            invalidate_rag_caches(result.document_id)
             
             schema_name = result.graph.schema_name if result.graph else settings.active_schema
             entity_count = result.graph.entity_count if result.graph else 0
@@ -159,6 +161,7 @@ async def upload_text(
             document_name=document_name,
             store_in_graph=True,
         )
+        invalidate_rag_caches(result.document_id)
         
         return {
             "success": result.success,
@@ -195,6 +198,7 @@ async def get_ingestion_status(document_id: str):
         progress={
             "pages_parsed": status.pages_parsed,
             "total_pages": status.total_pages,
+            "scanned_pages_skipped": status.scanned_pages_skipped,
             "entities_extracted": status.entities_extracted,
             "relationships_extracted": status.relationships_extracted,
         },
@@ -249,6 +253,7 @@ async def process_local_file(file_path: str):
             file_path=path,
             store_in_graph=True,
         )
+        invalidate_rag_caches(result.document_id)
         
         return {
             "success": result.success,
@@ -42,6 +42,11 @@ class Settings(BaseSettings):
     extraction_model: str = Field(default="gpt-4o-mini")
     extraction_temperature: float = Field(default=0.0)
     extraction_max_tokens: int = Field(default=4096)
+    extraction_max_concurrency: int = Field(default=8, description="Max concurrent chunk extraction calls per document")
+    extraction_warmup: bool = Field(
+        default=True,
+        description="Preload a local (ollama/) extraction model at startup so the first document skips the cold start"
+    )
 
     # =========================================================================
     # RAG CONFIGURATION
@@ -50,6 +55,26 @@ class Settings(BaseSettings):
     rag_temperature: float = Field(default=0.7)
     rag_max_tokens: int = Field(default=2048)
     rag_max_conversation_history: int = Field(default=10, description="Max conversation turns to keep")
+    rag_answer_cache_ttl: int = Field(
+        default=300,
+        description="Seconds an answer is reused for the same question and document (0 disables)"
+    )
+    rag_generation_timeout: float = Field(
+        default=60.0,
+        description="Seconds before an answer generation call is abandoned and retried (0 disables)"
+    )
+    rag_follow_up_timeout: float = Field(
+        default=15.0,
+        description="Seconds before a follow-up question call is abandoned and retried (0 disables)"
+    )
+    rag_generation_retries: int = Field(
+        default=1,
+        description="Extra attempts after a generation or follow-up call times out"
+    )
+    rag_retrieval_cache_ttl: int = Field(
+        default=300,
+        description="Seconds retrieved context is reused for the same query and document (0 disables)"
+    )
 
     # =========================================================================
     # CHUNKING CONFIGURATION
@@ -6,9 +6,10 @@ Supports OpenAI, Anthropic, Ollama, and other providers.
 import json
 import logging
 import re
-from typing import Any, Optional, Type, TypeVar
+from typing import Any, AsyncIterator, Optional, Type, TypeVar
 
 import litellm
+import orjson
 from litellm import acompletion
 from pydantic import BaseModel
 from tenacity import (
@@ -92,19 +93,16 @@ class LiteLLMNoiseFilter(logging.Filter):
         "completion() model=",
     ]
     
+    # All patterns in one regex so each message is scanned once
+    NOISE_REGEX = re.compile("|".join(map(re.escape, NOISE_PATTERNS)))
+    
     def filter(self, record: logging.LogRecord) -> bool:
-        message = record.getMessage()
-        
         # Always allow warnings and errors
         if record.levelno >= logging.WARNING:
             return True
         
         # Filter out known noisy patterns at INFO level
-        for pattern in self.NOISE_PATTERNS:
-            if pattern in message:
-                return False
-        
-        return True
+        return self.NOISE_REGEX.search(record.getMessage()) is None
 
 
 def setup_secure_logging():
@@ -191,6 +189,9 @@ class LLMClient:
         )
     """
 
+    # Model name prefixes that support explicit cache_control blocks
+    PROMPT_CACHE_MODEL_PREFIXES = ("anthropic/", "claude")
+
     def __init__(
         self,
         model: Optional[str] = None,
@@ -201,6 +202,9 @@ class LLMClient:
         self.temperature = temperature
         self.max_tokens = max_tokens
         
+        # Set once a completion has succeeded (the model is loaded/reachable)
+        self.model_loaded = False
+        
         # Configure LiteLLM
         self._configure_api_keys()
         
@@ -263,7 +267,9 @@ class LLMClient:
             # This is expected for local models (Ollama) and is not an error
             logger.debug(f"Cost calculation not available for {model}: {e}")
         
-        # Log usage with cost (if available)
+        # Log usage with cost (if available); skip formatting when disabled
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         if cost is not None and cost > 0:
             logger.debug(
                 f"LLM usage: {prompt_tokens} prompt + {completion_tokens} completion = "
@@ -275,6 +281,52 @@ class LLMClient:
                 f"{total_tokens} tokens (cost N/A for {model})"
             )
 
+    def _build_messages(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        model: str,
+        prompt_prefix: Optional[str] = None,
+        history: Optional[list[dict[str, str]]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Build chat messages, marking static parts as cacheable if supported.
+        
+        Static content (system prompt, prompt prefix) always comes first
+        and unchanged, so implicit prefix caching (OpenAI, vLLM) applies too.
+        Earlier conversation turns follow the system prompt as separate
+        messages rather than being folded into it.
+        """
+        history = history or []
+        if not model.startswith(self.PROMPT_CACHE_MODEL_PREFIXES):
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.extend(history)
+            if prompt_prefix:
+                prompt = f"{prompt_prefix}\n\n{prompt}"
+            messages.append({"role": "user", "content": prompt})
+            return messages
+        
+        cache_control = {"type": "ephemeral"}
+        messages = []
+        if system_prompt:
+            messages.append({
+                "role": "system",
+                "content": [
+                    {"type": "text", "text": system_prompt, "cache_control": cache_control},
+                ],
+            })
+        messages.extend(history)
+        content = []
+        if prompt_prefix:
+            content.append(
+                {"type": "text", "text": prompt_prefix, "cache_control": cache_control}
+            )
+        content.append({"type": "text", "text": prompt})
+        messages.append({"role": "user", "content": content})
+        return messages
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -287,6 +339,8 @@ class LLMClient:
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        prompt_prefix: Optional[str] = None,
+        history: Optional[list[dict[str, str]]] = None,
     ) -> str:
         """
         Generate a completion for the given prompt.
@@ -297,20 +351,22 @@ class LLMClient:
             model: Override default model
             temperature: Override default temperature
             max_tokens: Override default max tokens
+            prompt_prefix: Static leading part of the user message, shared
+                across many calls. Placed before the prompt so providers
+                with prefix caching can reuse it (explicitly marked for
+                caching on Anthropic models).
+            history: Earlier conversation turns as {"role", "content"}
+                messages, sent between the system prompt and the prompt
             
         Returns:
             Generated text response
         """
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
+        model = model or self.model
+        messages = self._build_messages(prompt, system_prompt, model, prompt_prefix, history)
         
         try:
             response = await acompletion(
-                model=model or self.model,
+                model=model,
                 messages=messages,
                 temperature=temperature if temperature is not None else self.temperature,
                 max_tokens=max_tokens or self.max_tokens,
@@ -319,15 +375,65 @@ class LLMClient:
             content = response.choices[0].message.content
             
             # Log token usage and cost
-            self._log_usage(response, model or self.model)
+            self._log_usage(response, model)
+            self.model_loaded = True
             
-            logger.debug(f"LLM response: {content[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"LLM response: {content[:200]}...")
             return content
             
         except Exception as e:
             logger.error(f"LLM completion failed: {e}")
             raise
 
+    async def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        history: Optional[list[dict[str, str]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a completion, yielding text fragments as they arrive.
+        
+        Not retried: fragments may already have been consumed when an
+        error occurs. Token usage is not logged for streamed responses.
+        
+        Args:
+            prompt: User prompt/message
+            system_prompt: Optional system prompt for context
+            model: Override default model
+            temperature: Override default temperature
+            max_tokens: Override default max tokens
+            history: Earlier conversation turns, as for complete()
+            
+        Yields:
+            Text fragments of the response, in order
+        """
+        model = model or self.model
+        messages = self._build_messages(prompt, system_prompt, model, None, history)
+        
+        try:
+            response = await acompletion(
+                model=model,
+                messages=messages,
+                temperature=temperature if temperature is not None else self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                stream=True,
+            )
+            self.model_loaded = True
+            
+            async for part in response:
+                content = part.choices[0].delta.content if part.choices else None
+                if content:
+                    yield content
+                    
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {e}")
+            raise
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -398,10 +504,10 @@ Important:
             logger.debug(f"LLM structured response: {content[:200]}...")
             
             # Parse and validate with Pydantic
-            data = json.loads(content)
+            data = orjson.loads(content)
             return response_model.model_validate(data)
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             raise ValueError(f"LLM response was not valid JSON: {e}")
         except Exception as e:
@@ -455,7 +561,7 @@ Important:
                         "id": tc.id,
                         "function": {
                             "name": tc.function.name,
-                            "arguments": json.loads(tc.function.arguments),
+                            "arguments": orjson.loads(tc.function.arguments),
                         },
                     }
                     for tc in message.tool_calls
@@ -467,6 +573,26 @@ Important:
             logger.error(f"Tool completion failed: {e}")
             raise
 
+    async def warmup(self) -> bool:
+        """
+        Force the model to load with a 1-token completion.
+        
+        Local backends (Ollama) load weights on the first request, so
+        calling this at startup moves that cold start out of the first
+        ingestion.
+        
+        Returns:
+            True if the model answered, False otherwise
+        """
+        try:
+            await self.complete("ok", max_tokens=1, temperature=0)
+        except Exception as e:
+            logger.warning(f"LLM warmup failed for {self.model}: {e}")
+            return False
+        
+        logger.info(f"LLM model loaded: {self.model}")
+        return True
+
     def get_usage_stats(self) -> dict[str, Any]:
         """
         Get cumulative usage statistics for this client instance.
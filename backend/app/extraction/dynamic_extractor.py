@@ -8,11 +8,12 @@ Now includes LLM-based metadata extraction (sections, temporal refs, key terms)
 controlled by the ExtractionStrategy.
 """
 
-import json
 import logging
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
+import orjson
+
 from app.core.llm import LLMClient, get_extraction_client
 from app.schema.loader import SchemaLoader, get_schema_loader
 from app.schema.models import (
@@ -133,6 +134,49 @@ class DynamicExtractor:
             print(f"Section: {result.chunk_metadata.section_heading}")
     """
     
+    # Expected JSON structure of a single chunk's extraction
+    CHUNK_OUTPUT_FORMAT = """{
+    "entities": {
+        "EntityType1": [
+            {
+                "id": "unique_id",
+                "property1": "value1",
+                "source_text": "exact quote from text",
+                "confidence": 0.95
+            }
+        ]
+    },
+    "relationships": [
+        {
+            "source_id": "entity_id",
+            "target_id": "entity_id", 
+            "relationship_type": "RELATIONSHIP_NAME",
+            "confidence": 0.9
+        }
+    ],
+    "metadata": {
+        "section_heading": "detected section or heading this text belongs to",
+        "section_level": 1,
+        "temporal_refs": [
+            {
+                "type": "date|duration|relative",
+                "text": "original text",
+                "normalized": "standardized value",
+                "context": "what this date/duration refers to"
+            }
+        ],
+        "key_terms": ["important", "domain", "terms"]
+    }
+}"""
+    
+    # Extraction rules appended to every chunk prompt
+    EXTRACTION_RULES = """RULES:
+- Generate unique IDs for each entity (e.g., "contract_1", "party_acme")
+- Include "source_text" with the exact quote for each entity
+- Set confidence (0.0-1.0) based on how explicitly information was stated
+- Only extract what is explicitly present in the text
+- For metadata, analyze the text structure and content"""
+    
     def __init__(
         self,
         schema_name: Optional[str] = None,
@@ -244,10 +288,11 @@ class DynamicExtractor:
         Returns:
             ExtractionResult with graph and chunk metadata
         """
-        logger.debug(f"Extracting chunk {chunk_index} with metadata")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Extracting chunk {chunk_index} with metadata")
         
-        # Generate combined extraction prompt
-        prompt = self._generate_combined_prompt(chunk_text)
+        # Generate combined extraction prompt (static instructions first)
+        prompt_prefix, prompt = self._generate_combined_prompt(chunk_text)
         system_prompt = self._get_combined_system_prompt()
         
         try:
@@ -255,27 +300,14 @@ class DynamicExtractor:
             response = await self.llm.complete(
                 prompt=prompt,
                 system_prompt=system_prompt,
+                prompt_prefix=prompt_prefix,
             )
             
             # Parse response
             graph, metadata = self._parse_response(response, source_document, chunk_index)
             
-            # Set chunk info in metadata
-            if metadata:
-                metadata.chunk_id = chunk_id
-                metadata.chunk_index = chunk_index
-                metadata.word_count = len(chunk_text.split())
-                metadata.char_count = len(chunk_text)
-            
-            # Validate
-            errors, warnings = self._validate_graph(graph)
-            
-            return ExtractionResult(
-                graph=graph,
-                chunk_metadata=metadata,
-                validation_errors=errors,
-                validation_warnings=warnings,
-                raw_response=response,
+            return self._build_chunk_result(
+                graph, metadata, chunk_text, chunk_id, chunk_index, response
             )
             
         except Exception as e:
@@ -296,17 +328,169 @@ class DynamicExtractor:
                 validation_errors=[f"Extraction failed: {str(e)}"],
             )
     
+    async def extract_chunks_batch(
+        self,
+        chunks: list[tuple[str, Optional[str], int]],
+        source_document: str = "unknown",
+    ) -> list[ExtractionResult]:
+        """
+        Extract entities AND metadata from several chunks in one LLM call.
+        
+        Amortizes the shared schema/strategy instructions over the batch.
+        Chunks missing from the response (or an unparseable response) fall
+        back to one extract_chunk call each.
+        
+        Args:
+            chunks: (chunk_text, chunk_id, chunk_index) tuples
+            source_document: Source document identifier
+            
+        Returns:
+            One ExtractionResult per chunk, in input order
+        """
+        if len(chunks) == 1:
+            chunk_text, chunk_id, chunk_index = chunks[0]
+            return [await self.extract_chunk(chunk_text, chunk_id, chunk_index, source_document)]
+        
+        logger.debug(f"Extracting {len(chunks)} chunks in one batch")
+        
+        prompt_prefix, prompt = self._generate_batch_prompt(
+            [(chunk_text, chunk_index) for chunk_text, _, chunk_index in chunks]
+        )
+        system_prompt = self._get_combined_system_prompt()
+        
+        results_by_index: dict[int, dict] = {}
+        response = None
+        try:
+            response = await self.llm.complete(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                prompt_prefix=prompt_prefix,
+            )
+            data = self._load_json(response)
+            raw_results = data.get("results") if isinstance(data, dict) else None
+            if isinstance(raw_results, list):
+                for item in raw_results:
+                    if isinstance(item, dict) and isinstance(item.get("chunk_index"), int):
+                        results_by_index.setdefault(item["chunk_index"], item)
+        except Exception as e:
+            logger.warning(f"Batch extraction failed, falling back to single chunks: {e}")
+        
+        results = []
+        for chunk_text, chunk_id, chunk_index in chunks:
+            item = results_by_index.get(chunk_index)
+            if item is None:
+                results.append(
+                    await self.extract_chunk(chunk_text, chunk_id, chunk_index, source_document)
+                )
+                continue
+            
+            graph, metadata = self._parse_data(item, source_document, chunk_index)
+            results.append(self._build_chunk_result(
+                graph, metadata, chunk_text, chunk_id, chunk_index, response
+            ))
+        
+        return results
+    
+    def _build_chunk_result(
+        self,
+        graph: DynamicGraph,
+        metadata: Optional[ChunkMetadata],
+        chunk_text: str,
+        chunk_id: Optional[str],
+        chunk_index: int,
+        response: Optional[str],
+    ) -> ExtractionResult:
+        """Attach chunk info to parsed metadata and validate the graph."""
+        # Set chunk info in metadata
+        if metadata:
+            metadata.chunk_id = chunk_id
+            metadata.chunk_index = chunk_index
+            metadata.word_count = len(chunk_text.split())
+            metadata.char_count = len(chunk_text)
+        
+        # Validate
+        errors, warnings = self._validate_graph(graph)
+        
+        return ExtractionResult(
+            graph=graph,
+            chunk_metadata=metadata,
+            validation_errors=errors,
+            validation_warnings=warnings,
+            raw_response=response,
+        )
+    
     def _generate_entity_prompt(self, text: str) -> str:
         """Generate prompt for entity extraction only."""
         return self.schema_loader.generate_extraction_prompt(self.schema, text)
     
-    def _generate_combined_prompt(self, chunk_text: str) -> str:
+    def _generate_combined_prompt(self, chunk_text: str) -> tuple[str, str]:
         """
         Generate a combined prompt for entities + metadata extraction.
         
         This creates a single prompt that asks the LLM to extract both
         entities (per schema) and metadata (per strategy).
+        
+        Returns:
+            Tuple of (static_prefix, chunk_part). The prefix (schema, output
+            format, rules) is byte-identical for every chunk so providers
+            can cache it; only the trailing chunk part varies.
+        """
+        prompt_prefix = f"""Analyze the text excerpt at the end of this message and extract structured information.
+
+{self._build_schema_instructions()}
+
+## OUTPUT FORMAT
+
+Return a JSON object with this exact structure:
+{self.CHUNK_OUTPUT_FORMAT}
+
+{self.EXTRACTION_RULES}"""
+        
+        return prompt_prefix, f"## TEXT TO ANALYZE\n\n{chunk_text}"
+    
+    def _generate_batch_prompt(self, chunks: list[tuple[str, int]]) -> tuple[str, str]:
         """
+        Generate a combined prompt covering several chunks at once.
+        
+        Args:
+            chunks: (chunk_text, chunk_index) pairs
+            
+        Returns:
+            Tuple of (static_prefix, excerpts_part), as for
+            _generate_combined_prompt
+        """
+        excerpts = "\n\n".join(
+            f"### Chunk {chunk_index}\n\n{chunk_text}"
+            for chunk_text, chunk_index in chunks
+        )
+        
+        prompt_prefix = f"""Analyze each of the text excerpts at the end of this message separately and extract structured information.
+
+{self._build_schema_instructions()}
+
+## OUTPUT FORMAT
+
+Return a JSON object with one result per excerpt:
+{{
+    "results": [
+        {{
+            "chunk_index": 0,
+            ...one object per excerpt, each with the structure below
+        }}
+    ]
+}}
+
+Each result object has this exact structure (plus its "chunk_index"):
+{self.CHUNK_OUTPUT_FORMAT}
+
+{self.EXTRACTION_RULES}
+- Return exactly one result per excerpt, with "chunk_index" set to the excerpt's chunk number
+- Extract from each excerpt independently"""
+        
+        return prompt_prefix, f"## TEXT EXCERPTS TO ANALYZE\n\n{excerpts}"
+    
+    def _build_schema_instructions(self) -> str:
+        """Build the schema and metadata sections shared by chunk prompts."""
         # Build entity descriptions
         entity_sections = []
         for entity in self.schema.entities:
@@ -333,10 +517,7 @@ Properties:
         # Build metadata extraction instructions based on strategy
         metadata_instructions = self._build_metadata_instructions()
         
-        # Build the combined prompt
-        prompt = f"""Analyze this text excerpt and extract structured information.
-
-## SCHEMA: {self.schema.schema_info.name}
+        return f"""## SCHEMA: {self.schema.schema_info.name}
 {self.schema.schema_info.description}
 
 ## ENTITY TYPES TO EXTRACT
@@ -347,57 +528,7 @@ Properties:
 
 {chr(10).join(rel_sections)}
 
-{metadata_instructions}
-
-## TEXT TO ANALYZE
-
-{chunk_text}
-
-## OUTPUT FORMAT
-
-Return a JSON object with this exact structure:
-{{
-    "entities": {{
-        "EntityType1": [
-            {{
-                "id": "unique_id",
-                "property1": "value1",
-                "source_text": "exact quote from text",
-                "confidence": 0.95
-            }}
-        ]
-    }},
-    "relationships": [
-        {{
-            "source_id": "entity_id",
-            "target_id": "entity_id", 
-            "relationship_type": "RELATIONSHIP_NAME",
-            "confidence": 0.9
-        }}
-    ],
-    "metadata": {{
-        "section_heading": "detected section or heading this text belongs to",
-        "section_level": 1,
-        "temporal_refs": [
-            {{
-                "type": "date|duration|relative",
-                "text": "original text",
-                "normalized": "standardized value",
-                "context": "what this date/duration refers to"
-            }}
-        ],
-        "key_terms": ["important", "domain", "terms"]
-    }}
-}}
-
-RULES:
-- Generate unique IDs for each entity (e.g., "contract_1", "party_acme")
-- Include "source_text" with the exact quote for each entity
-- Set confidence (0.0-1.0) based on how explicitly information was stated
-- Only extract what is explicitly present in the text
-- For metadata, analyze the text structure and content"""
-
-        return prompt
+{metadata_instructions}"""
     
     def _build_metadata_instructions(self) -> str:
         """Build metadata extraction instructions based on strategy."""
@@ -479,6 +610,22 @@ METADATA EXTRACTION:
         chunk_index: int = 0,
     ) -> tuple[DynamicGraph, Optional[ChunkMetadata]]:
         """Parse LLM response into DynamicGraph and ChunkMetadata."""
+        try:
+            data = self._load_json(response)
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON: {e}")
+            logger.debug(f"Raw response: {response[:500]}...")
+            return DynamicGraph(
+                schema_name=self.schema.schema_info.name,
+                source_document=source_document,
+                extraction_model=self.llm.model,
+            ), None
+        
+        return self._parse_data(data, source_document, chunk_index)
+    
+    @staticmethod
+    def _load_json(response: str) -> Any:
+        """Decode an LLM JSON response, stripping markdown code fences."""
         # Clean response
         cleaned = response.strip()
         if cleaned.startswith("```json"):
@@ -489,17 +636,15 @@ METADATA EXTRACTION:
             cleaned = cleaned[:-3]
         cleaned = cleaned.strip()
         
-        try:
-            data = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON: {e}")
-            logger.debug(f"Raw response: {response[:500]}...")
-            return DynamicGraph(
-                schema_name=self.schema.schema_info.name,
-                source_document=source_document,
-                extraction_model=self.llm.model,
-            ), None
-        
+        return orjson.loads(cleaned)
+    
+    def _parse_data(
+        self,
+        data: dict,
+        source_document: str,
+        chunk_index: int = 0,
+    ) -> tuple[DynamicGraph, Optional[ChunkMetadata]]:
+        """Build DynamicGraph and ChunkMetadata from decoded response data."""
         # Create graph
         graph = DynamicGraph(
             schema_name=self.schema.schema_info.name,
@@ -7,7 +7,11 @@ nodes and relationships based on the schema definition.
 Now includes chunk node operations for enhanced retrieval.
 """
 
+import json
 import logging
+import re
+import time
+from collections import defaultdict
 from typing import Any, Optional, TYPE_CHECKING
 
 from app.core.neo4j_client import Neo4jClient, get_neo4j_client
@@ -53,6 +57,16 @@ class DynamicGraphRepository:
         entities = await repo.get_entities_by_type("Author")
     """
     
+    # Rows sent per UNWIND query in bulk writes
+    WRITE_BATCH_SIZE = 5000
+    
+    # Full-text (Lucene) index over chunk text, used by the "fulltext"
+    # chunk text search method
+    CHUNK_FULLTEXT_INDEX = "chunk_text_fulltext"
+    
+    # Lucene query syntax characters, escaped so search text matches literally
+    LUCENE_SPECIAL_REGEX = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+    
     def __init__(
         self,
         client: Optional[Neo4jClient] = None,
@@ -122,6 +136,14 @@ class DynamicGraphRepository:
         
         if result["failed"] > 0:
             logger.warning(f"Index creation failures: {result['failed']}")
+        
+        try:
+            await self.client.execute_write(
+                f"CREATE FULLTEXT INDEX {self.CHUNK_FULLTEXT_INDEX} IF NOT EXISTS "
+                f"FOR (c:Chunk) ON EACH [c.text]"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to create chunk full-text index: {e}")
     
     # =========================================================================
     # DOCUMENT OPERATIONS
@@ -184,21 +206,47 @@ class DynamicGraphRepository:
         counts = {"chunks": 0, "sequential_links": 0, "document_links": 0}
         
         # Create all chunk nodes
-        for chunk in chunks:
-            await self.create_chunk_node(chunk, document_id)
-            counts["chunks"] += 1
+        await self._write_batched(
+            """
+            UNWIND $rows AS row
+            MERGE (n:Chunk {id: row.id})
+            SET n += row
+            """,
+            [self._chunk_properties(chunk, document_id) for chunk in chunks],
+        )
+        counts["chunks"] = len(chunks)
         
         # Create sequential links
         if link_sequential and len(chunks) > 1:
-            for i in range(len(chunks) - 1):
-                await self.link_chunks_sequential(chunks[i].id, chunks[i + 1].id)
-                counts["sequential_links"] += 1
+            pairs = [
+                {"id1": chunks[i].id, "id2": chunks[i + 1].id}
+                for i in range(len(chunks) - 1)
+            ]
+            await self._write_batched(
+                """
+                UNWIND $rows AS row
+                MATCH (a:Chunk {id: row.id1})
+                MATCH (b:Chunk {id: row.id2})
+                MERGE (a)-[:NEXT_CHUNK]->(b)
+                MERGE (b)-[:PREV_CHUNK]->(a)
+                """,
+                pairs,
+            )
+            counts["sequential_links"] = len(pairs)
         
         # Create document links
-        if link_to_document:
-            for chunk in chunks:
-                await self.link_chunk_to_document(chunk.id, document_id)
-                counts["document_links"] += 1
+        if link_to_document and chunks:
+            await self._write_batched(
+                """
+                MATCH (d:Document {id: $doc_id})
+                UNWIND $rows AS chunk_id
+                MATCH (c:Chunk {id: chunk_id})
+                MERGE (c)-[:FROM_DOCUMENT]->(d)
+                """,
+                [chunk.id for chunk in chunks],
+                doc_id=document_id,
+            )
+            counts["document_links"] = len(chunks)
         
         logger.info(f"Stored {counts['chunks']} chunks for document {document_id}")
         return counts
@@ -215,6 +263,21 @@ class DynamicGraphRepository:
             chunk: TextChunk object
             document_id: Parent document ID
         """
+        props = self._chunk_properties(chunk, document_id)
+        
+        prop_sets = [f"n.{key} = ${key}" for key in props.keys()]
+        set_clause = ", ".join(prop_sets)
+        
+        query = f"""
+        MERGE (n:Chunk {{id: $id}})
+        SET {set_clause}
+        """
+        
+        await self.client.execute_write(query, props)
+    
+    @staticmethod
+    def _chunk_properties(chunk: "TextChunk", document_id: str) -> dict[str, Any]:
+        """Build the Neo4j property map for a chunk node."""
         # Build properties from chunk
         props = {
             "id": chunk.id,
@@ -232,20 +295,11 @@ class DynamicGraphRepository:
             if value is not None:
                 # Flatten complex types to strings
                 if isinstance(value, (list, dict)):
-                    import json
                     props[key] = json.dumps(value)
                 else:
                     props[key] = value
         
-        prop_sets = [f"n.{key} = ${key}" for key in props.keys()]
-        set_clause = ", ".join(prop_sets)
-        
-        query = f"""
-        MERGE (n:Chunk {{id: $id}})
-        SET {set_clause}
-        """
-        
-        await self.client.execute_write(query, props)
+        return props
     
     async def link_chunks_sequential(
         self,
@@ -296,6 +350,37 @@ class DynamicGraphRepository:
             "chunk_id": chunk_id,
         })
     
+    async def link_entities_to_chunks(
+        self,
+        links: list[tuple[str, str, str]],
+    ) -> int:
+        """
+        Create EXTRACTED_FROM relationships in bulk.
+        
+        Args:
+            links: (entity_type, entity_id, chunk_id) tuples. Entities are
+                matched by type label so the per-type id index is used.
+            
+        Returns:
+            Number of links requested
+        """
+        by_type: dict[str, list[dict[str, str]]] = defaultdict(list)
+        for entity_type, entity_id, chunk_id in links:
+            by_type[entity_type].append({"entity_id": entity_id, "chunk_id": chunk_id})
+        
+        # Entity types come from our validated schema, so the label is safe
+        for entity_type, rows in by_type.items():
+            await self._write_batched(
+                f"""
+                UNWIND $rows AS row
+                MATCH (e:{entity_type} {{id: row.entity_id}})
+                MATCH (c:Chunk {{id: row.chunk_id}})
+                MERGE (e)-[:EXTRACTED_FROM]->(c)
+                """,
+                rows,
+            )
+        return len(links)
+    
     async def get_chunk_by_id(self, chunk_id: str) -> Optional[dict[str, Any]]:
         """Get a chunk by ID."""
         query = """
@@ -350,39 +435,92 @@ class DynamicGraphRepository:
         Returns:
             Dict with 'before', 'current', 'after' chunks
         """
-        # Build dynamic pattern based on before/after counts
-        query = """
-        MATCH (current:Chunk {id: $id})
-        OPTIONAL MATCH path_before = (current)<-[:NEXT_CHUNK*1..""" + str(before) + """]-(before:Chunk)
-        OPTIONAL MATCH path_after = (current)-[:NEXT_CHUNK*1..""" + str(after) + """]->(after:Chunk)
-        WITH current, 
-             collect(DISTINCT before) as before_chunks,
-             collect(DISTINCT after) as after_chunks
-        RETURN current,
-               before_chunks,
-               after_chunks
+        neighbors = await self.get_neighboring_chunks_batch([chunk_id], before, after)
+        return neighbors.get(chunk_id, {"before": [], "current": None, "after": []})
+    
+    async def get_neighboring_chunks_batch(
+        self,
+        chunk_ids: list[str],
+        before: int = 1,
+        after: int = 1,
+        within_section: bool = False,
+    ) -> dict[str, dict[str, Any]]:
         """
+        Get neighboring chunks for many chunks in one query.
         
-        results = await self.client.execute_query(query, {"id": chunk_id})
-        
-        if not results:
-            return {"before": [], "current": None, "after": []}
-        
-        result = results[0]
+        Args:
+            chunk_ids: Target chunk IDs
+            before: Number of chunks before each
+            after: Number of chunks after each
+            within_section: Only walk to neighbors in the same section
+                (same section_heading, without crossing another section),
+                and also return the chunk opening that section: the start
+                of the unbroken NEXT_CHUNK run sharing the heading
+            
+        Returns:
+            Dict mapping each found chunk ID to its 'before', 'current',
+            'after' chunks (as returned by get_neighboring_chunks), plus
+            'section_head' (chunk dict or None) when within_section is set
+        """
+        if not chunk_ids:
+            return {}
         
-        # Sort before chunks by index (descending distance from current)
-        before_list = [dict(c) for c in result["before_chunks"] if c]
-        before_list.sort(key=lambda x: x.get("chunk_index", 0))
+        # Chunks without a section heading fall back to the plain window
+        before_filter = after_filter = ""
+        if within_section:
+            before_filter = """
+        WHERE current.section_heading IS NULL
+           OR all(n IN nodes(path_before) WHERE n.section_heading = current.section_heading)"""
+            after_filter = """
+        WHERE current.section_heading IS NULL
+           OR all(n IN nodes(path_after) WHERE n.section_heading = current.section_heading)"""
+        
+        # Build dynamic pattern based on before/after counts; collecting
+        # between the two matches avoids a before x after cross product
+        query = """
+        UNWIND $ids AS cid
+        MATCH (current:Chunk {id: cid})
+        OPTIONAL MATCH path_before = (current)<-[:NEXT_CHUNK*1..""" + str(before) + """]-(before:Chunk)""" + before_filter + """
+        WITH cid, current, collect(DISTINCT before) as before_chunks
+        OPTIONAL MATCH path_after = (current)-[:NEXT_CHUNK*1..""" + str(after) + """]->(after:Chunk)""" + after_filter + """
+        WITH cid, current, before_chunks, collect(DISTINCT after) as after_chunks
+        """
+        if within_section:
+            query += """
+        OPTIONAL MATCH path_head = (current)<-[:NEXT_CHUNK*]-(head:Chunk)
+        WHERE current.section_heading IS NOT NULL
+          AND all(n IN nodes(path_head) WHERE n.section_heading = current.section_heading)
+        WITH cid, current, before_chunks, after_chunks, head, length(path_head) AS head_distance
+        ORDER BY head_distance DESC
+        RETURN cid, current, before_chunks, after_chunks, collect(head)[0] as section_head
+        """
+        else:
+            query += """
+        RETURN cid, current, before_chunks, after_chunks
+        """
         
-        # Sort after chunks by index
-        after_list = [dict(c) for c in result["after_chunks"] if c]
-        after_list.sort(key=lambda x: x.get("chunk_index", 0))
+        # Each distinct chunk is expanded once, however often it was passed
+        results = await self.client.execute_query(query, {"ids": list(dict.fromkeys(chunk_ids))})
         
-        return {
-            "before": before_list,
-            "current": dict(result["current"]) if result["current"] else None,
-            "after": after_list,
-        }
+        neighbors = {}
+        for result in results:
+            # Sort before chunks by index (descending distance from current)
+            before_list = [dict(c) for c in result["before_chunks"] if c]
+            before_list.sort(key=lambda x: x.get("chunk_index", 0))
+            
+            # Sort after chunks by index
+            after_list = [dict(c) for c in result["after_chunks"] if c]
+            after_list.sort(key=lambda x: x.get("chunk_index", 0))
+            
+            neighbors[result["cid"]] = {
+                "before": before_list,
+                "current": dict(result["current"]) if result["current"] else None,
+                "after": after_list,
+            }
+            if within_section:
+                head = result.get("section_head")
+                neighbors[result["cid"]]["section_head"] = dict(head) if head else None
+        return neighbors
     
     async def search_chunks_by_text(
         self,
@@ -390,6 +528,7 @@ class DynamicGraphRepository:
         document_id: Optional[str] = None,
         limit: int = 10,
         return_query: bool = False,
+        method: str = "contains",
     ) -> list[dict[str, Any]] | tuple[list[dict[str, Any]], dict[str, Any]]:
         """
         Search chunks by text content.
@@ -399,13 +538,28 @@ class DynamicGraphRepository:
             document_id: Optional document to limit search
             limit: Maximum results
             return_query: If True, return (results, query_info) tuple
+            method: "contains" for a case-insensitive substring scan, or
+                "fulltext" to look up the words of search_text (any of
+                them) in the chunk full-text index, best matches first
             
         Returns:
             List of matching chunks, or (chunks, query_info) if return_query=True
         """
-        import time
-        
-        if document_id:
+        if method == "fulltext":
+            # Lowercase so words like AND/OR/NOT are not read as operators
+            lucene_query = self.LUCENE_SPECIAL_REGEX.sub(r"\\\1", search_text.lower()).strip()
+            doc_filter = "WHERE c.document_id = $doc_id" if document_id else ""
+            query = f"""
+            CALL db.index.fulltext.queryNodes($index, $search) YIELD node AS c, score
+            {doc_filter}
+            RETURN c
+            ORDER BY score DESC
+            LIMIT $limit
+            """
+            params = {"index": self.CHUNK_FULLTEXT_INDEX, "search": lucene_query, "limit": limit}
+            if document_id:
+                params["doc_id"] = document_id
+        elif document_id:
             query = """
             MATCH (c:Chunk {document_id: $doc_id})
             WHERE toLower(c.text) CONTAINS toLower($search)
@@ -423,9 +577,9 @@ class DynamicGraphRepository:
             """
             params = {"search": search_text, "limit": limit}
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         results = await self.client.execute_query(query, params)
-        exec_time = (time.time() - start_time) * 1000
+        exec_time = (time.perf_counter() - start_time) * 1000
         
         chunks = [dict(r["c"]) for r in results]
         
@@ -457,8 +611,6 @@ class DynamicGraphRepository:
         Returns:
             List of matching chunks with match counts
         """
-        import time
-        
         # Convert terms to lowercase for matching
         terms_lower = [t.lower() for t in terms]
         
@@ -485,9 +637,9 @@ class DynamicGraphRepository:
             """
             params = {"terms": terms_lower, "limit": limit}
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         results = await self.client.execute_query(query, params)
-        exec_time = (time.time() - start_time) * 1000
+        exec_time = (time.perf_counter() - start_time) * 1000
         
         matches = [{"chunk": dict(r["c"]), "match_count": r["match_count"]} for r in results]
         
@@ -535,8 +687,6 @@ class DynamicGraphRepository:
         Returns:
             List of chunks with temporal_refs
         """
-        import time
-        
         conditions = ["c.temporal_refs IS NOT NULL"]
         params = {}
         
@@ -556,9 +706,9 @@ class DynamicGraphRepository:
         ORDER BY c.chunk_index
         """
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         results = await self.client.execute_query(query, params)
-        exec_time = (time.time() - start_time) * 1000
+        exec_time = (time.perf_counter() - start_time) * 1000
         
         chunks = [dict(r["c"]) for r in results]
         
@@ -615,19 +765,111 @@ class DynamicGraphRepository:
         counts = {"entities": 0, "relationships": 0}
         
         # Store all entities
-        for entity_type, entities in graph.entities.items():
-            for entity in entities:
-                await self.create_entity(entity)
-                counts["entities"] += 1
+        counts["entities"] = await self.create_entities(graph.get_all_entities())
         
         # Store all relationships
-        for rel in graph.relationships:
-            await self.create_relationship(rel)
-            counts["relationships"] += 1
+        counts["relationships"] = await self.store_relationships(graph.relationships)
         
         logger.info(f"Stored graph: {counts}")
         return counts
     
+    async def store_relationships(self, relationships: list[DynamicRelationship]) -> int:
+        """
+        Store relationships whose endpoint entities are already in Neo4j.
+        
+        Returns:
+            Number of relationships stored
+        """
+        by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for rel in relationships:
+            by_type[rel.relationship_type].append({
+                "source_id": rel.source_id,
+                "target_id": rel.target_id,
+                "rel_id": rel.id,
+                "confidence": rel.confidence,
+            })
+        
+        # Relationship types come from our validated schema, so they're safe
+        for rel_type, rows in by_type.items():
+            await self._write_batched(
+                f"""
+                UNWIND $rows AS row
+                MATCH (source {{id: row.source_id}})
+                MATCH (target {{id: row.target_id}})
+                MERGE (source)-[r:{rel_type}]->(target)
+                SET r.id = row.rel_id,
+                    r.confidence = row.confidence
+                """,
+                rows,
+            )
+        return len(relationships)
+    
+    async def create_entities(self, entities: list[DynamicEntity]) -> int:
+        """
+        Create (merge) entity nodes in bulk, one UNWIND query per type.
+        
+        Returns:
+            Number of entities written
+        """
+        by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for entity in entities:
+            by_type[entity.entity_type].append(entity.to_neo4j_properties())
+        
+        for entity_type, rows in by_type.items():
+            await self._write_batched(
+                f"""
+                UNWIND $rows AS row
+                MERGE (n:{entity_type} {{id: row.id}})
+                SET n += row
+                """,
+                rows,
+            )
+        return len(entities)
+    
+    async def delete_entities(self, entities: list[DynamicEntity]) -> int:
+        """
+        Delete entity nodes (and their relationships) in bulk, one query per type.
+        
+        A node is only deleted while its stored source_document still
+        matches the entity's, so nodes since merged by another document
+        are kept. Entities without a source_document are skipped.
+        
+        Returns:
+            Number of entities requested for deletion
+        """
+        by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for entity in entities:
+            if entity.source_document is None:
+                continue
+            by_type[entity.entity_type].append({
+                "id": entity.id,
+                "source_document": entity.source_document,
+            })
+        
+        for entity_type, rows in by_type.items():
+            await self._write_batched(
+                f"""
+                UNWIND $rows AS row
+                MATCH (n:{entity_type} {{id: row.id}})
+                WHERE n.source_document = row.source_document
+                DETACH DELETE n
+                """,
+                rows,
+            )
+        return len(entities)
+    
+    async def _write_batched(
+        self,
+        query: str,
+        rows: list[Any],
+        **params: Any,
+    ) -> None:
+        """Run an UNWIND $rows write query over rows, WRITE_BATCH_SIZE at a time."""
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            await self.client.execute_write(
+                query, {**params, "rows": rows[start:start + self.WRITE_BATCH_SIZE]}
+            )
+    
     async def create_entity(self, entity: DynamicEntity) -> None:
         """Create an entity node in Neo4j."""
         # Build properties
@@ -9,6 +9,7 @@ Provides multiple chunking approaches:
 Now with enhanced metadata support for the strategy system.
 """
 
+import copy
 import logging
 import re
 from dataclasses import dataclass, field
@@ -164,30 +165,21 @@ class TextChunker:
         if effective_chunk_overlap is None:
             effective_chunk_overlap = self.chunk_overlap
         
-        # Temporarily override instance settings for this call
-        original_chunk_size = self.chunk_size
-        original_chunk_overlap = self.chunk_overlap
-        self.chunk_size = effective_chunk_size
-        self.chunk_overlap = effective_chunk_overlap
-        
-        try:
-            # Get base chunks with the determined parameters
-            chunks = self.chunk_text(
-                parsed_doc.full_text,
-                metadata={"document_id": doc_id},
-            )
-        finally:
-            # Restore original settings
-            self.chunk_size = original_chunk_size
-            self.chunk_overlap = original_chunk_overlap
+        # Get base chunks with the determined parameters
+        chunker = self._with_sizes(effective_chunk_size, effective_chunk_overlap)
+        chunks = chunker.chunk_text(
+            parsed_doc.full_text,
+            metadata={"document_id": doc_id},
+        )
         
         # Enrich chunks with metadata based on strategy
+        page_resolver = parsed_doc.page_resolver()
         for chunk in chunks:
             chunk.document_id = doc_id
             
             # Add page number if strategy enables it
             if extraction_strategy is None or extraction_strategy.metadata.page_numbers.enabled:
-                page_start, page_end = parsed_doc.get_page_range_for_text_span(
+                page_start, page_end = page_resolver.page_range(
                     chunk.start_char, chunk.end_char
                 )
                 chunk.metadata["page_number"] = page_start
@@ -479,6 +471,21 @@ class TextChunker:
         
         return chunks
     
+    def _with_sizes(self, chunk_size: int, chunk_overlap: int) -> "TextChunker":
+        """
+        Get a chunker using the given sizes.
+        
+        Returns a shallow copy rather than overriding this instance's
+        settings, so one chunker can be shared by concurrent threads.
+        """
+        if chunk_size == self.chunk_size and chunk_overlap == self.chunk_overlap:
+            return self
+        
+        chunker = copy.copy(self)
+        chunker.chunk_size = chunk_size
+        chunker.chunk_overlap = chunk_overlap
+        return chunker
+    
     def _count_sentences(self, text: str) -> int:
         """Count sentences in text."""
         # Simple sentence count based on common terminators
@@ -509,21 +516,11 @@ class TextChunker:
         char_size = max_tokens * 4
         char_overlap = overlap_tokens * 4
         
-        # Temporarily override chunk settings
-        original_size = self.chunk_size
-        original_overlap = self.chunk_overlap
-        self.chunk_size = char_size
-        self.chunk_overlap = char_overlap
-        
         # Use fixed chunking with estimated sizes
-        result = self._chunk_fixed(text, metadata or {})
+        result = self._with_sizes(char_size, char_overlap)._chunk_fixed(text, metadata or {})
         
         # Add estimated token counts to metadata
         for chunk in result:
             chunk.metadata["estimated_tokens"] = self.estimate_tokens(chunk.text)
         
-        # Restore original settings
-        self.chunk_size = original_size
-        self.chunk_overlap = original_overlap
-        
         return result
@@ -57,6 +57,12 @@ class TermExtractor:
         r"(?:means|refers\s+to|shall\s+mean)\s+([A-Za-z][^\.\,]{3,50})",  # means XYZ
     ]
     
+    # Whitespace runs inside extracted terms
+    _WS_RE = re.compile(r"\s+")
+    
+    # Words and multi-word capitalized phrases for frequency counting
+    _WORD_RE = re.compile(r"\b[A-Za-z]+(?:\s+[A-Z][a-z]+)*\b")
+    
     def __init__(
         self,
         method: str = "frequency",
@@ -74,8 +80,10 @@ class TermExtractor:
         if additional_stopwords:
             self.stopwords.update(additional_stopwords)
         
+        # Patterns run separately: an alternation would only keep the
+        # leftmost match where patterns overlap, dropping terms
         self._defined_patterns = [
-            re.compile(p, re.IGNORECASE) 
+            re.compile(p, re.IGNORECASE)
             for p in self.DEFINED_TERM_PATTERNS
         ]
     
@@ -101,7 +109,7 @@ class TermExtractor:
             freq_terms = self._extract_by_frequency(
                 text, 
                 max_terms - len(terms),
-                exclude=set(t.lower() for t in terms),
+                exclude=frozenset(t.lower() for t in terms) or None,
             )
             terms.extend(freq_terms)
         
@@ -109,14 +117,16 @@ class TermExtractor:
     
     def _extract_defined_terms(self, text: str) -> list[str]:
         """Extract explicitly defined terms (quoted or marked)."""
-        terms = []
+        terms: list[str] = []
+        seen: set[str] = set()
         
         for pattern in self._defined_patterns:
             for match in pattern.finditer(text):
                 term = match.group(1).strip()
                 # Clean up common artifacts
-                term = re.sub(r'\s+', ' ', term)
-                if term and len(term) > 2 and term not in terms:
+                term = self._WS_RE.sub(' ', term)
+                if len(term) > 2 and term not in seen:
+                    seen.add(term)
                     terms.append(term)
         
         return terms
@@ -125,32 +135,36 @@ class TermExtractor:
         self,
         text: str,
         max_terms: int,
-        exclude: Optional[set[str]] = None,
+        exclude: Optional[frozenset[str]] = None,
     ) -> list[str]:
-        """Extract terms by word frequency."""
-        exclude = exclude or set()
+        """
+        Extract terms by word frequency.
         
-        # Tokenize - keep multi-word capitalized phrases
-        words = re.findall(r'\b[A-Za-z]+(?:\s+[A-Z][a-z]+)*\b', text)
+        Args:
+            text: Text to analyze
+            max_terms: Maximum number of terms to return
+            exclude: Already-lowercased terms to skip, or None for no exclusions
+        """
+        # Tokenize - keep multi-word capitalized phrases. Counting raw tokens
+        # first lets the filter below run once per distinct token.
+        token_counts = Counter(self._WORD_RE.findall(text))
         
         # Filter and normalize
-        filtered = []
-        for word in words:
+        freq: Counter = Counter()
+        for word, count in token_counts.items():
             word_lower = word.lower()
+            if exclude and word_lower in exclude:
+                continue
             if (
                 word_lower not in self.stopwords
-                and word_lower not in exclude
                 and len(word) > 2
                 and not word.isdigit()
             ):
                 # Keep original case for proper nouns, lowercase for others
                 if word[0].isupper() and len(word) > 1 and word[1].islower():
-                    filtered.append(word)  # Proper noun
+                    freq[word] += count  # Proper noun
                 else:
-                    filtered.append(word_lower)
-        
-        # Count frequencies
-        freq = Counter(filtered)
+                    freq[word_lower] += count
         
         # Get most common
         return [term for term, _ in freq.most_common(max_terms)]
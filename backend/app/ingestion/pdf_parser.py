@@ -8,17 +8,104 @@ Supports:
 - Table detection (basic)
 """
 
+import bisect
 import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from itertools import accumulate
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
+# Text cleanup tables, built once at import time
+_CLEAN_TRANSLATION = str.maketrans({"\r": None, "\x0c": None})
+_TRAILING_WS_RE = re.compile(r"[^\S\n]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_MULTI_SPACE_RE = re.compile(r" {2,}")
 
-@dataclass
+# Separator between page texts in the joined document text; page offsets
+# are derived from its length
+_PAGE_SEPARATOR = "\n\n"
+
+# Text extraction flags, resolved once: plain-text output without image
+# blocks (PyMuPDF's default for "text" mode)
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Progress callback: (pages_done, total_pages)
+ProgressCallback = Callable[[int, int], None]
+
+# In-memory PDF content; any of these is opened by MuPDF without a copy to
+# bytes or a round-trip through the filesystem
+PDFBuffer = bytes | bytearray | memoryview
+
+
+# Document handles kept open for repeated get_page_text lookups (LRU),
+# keyed by path and modification time so a replaced file is reopened
+MAX_OPEN_DOCUMENTS = 32
+_open_documents: OrderedDict[tuple[str, float], fitz.Document] = OrderedDict()
+
+# PyMuPDF is not thread-safe: only one thread at a time may parse or read
+# pages, so every use of fitz in this process runs under this lock
+_fitz_lock = threading.Lock()
+
+
+def _reset_fitz_lock() -> None:
+    """Give a forked worker a fresh lock; another thread may hold the parent's."""
+    global _fitz_lock
+    _fitz_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_fitz_lock)
+
+
+def _open_document(path: str, mtime: float) -> fitz.Document:
+    """
+    Open a PDF once and keep the handle for repeated page lookups.
+    
+    Evicted handles are closed. Callers must hold _fitz_lock.
+    """
+    key = (path, mtime)
+    doc = _open_documents.get(key)
+    if doc is not None:
+        _open_documents.move_to_end(key)
+        return doc
+    
+    doc = fitz.open(path)
+    _open_documents[key] = doc
+    while len(_open_documents) > MAX_OPEN_DOCUMENTS:
+        _, evicted = _open_documents.popitem(last=False)
+        evicted.close()
+    return doc
+
+
+def _extract_page_range(
+    source: str | bytes | bytearray, options: dict, start: int, stop: int
+) -> list["PageContent"]:
+    """Worker entry point: extract pages [start, stop) of a PDF."""
+    parser = PDFParser(**options)
+    if not isinstance(source, str):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source)
+    try:
+        return [
+            parser._extract_page(doc[page_num], page_num + 1)
+            for page_num in range(start, stop)
+        ]
+    finally:
+        doc.close()
+
+
+@dataclass(slots=True)
 class PageContent:
     """Content extracted from a single PDF page."""
     
@@ -28,13 +115,14 @@ class PageContent:
     end_char: int = 0    # Character offset where this page ends in full_text
     tables: list[str] = field(default_factory=list)
     images: int = 0  # Count of images
+    scanned: bool = False  # Image-only scan, text extraction was skipped
+    word_count: int = field(init=False)  # Computed once from text
     
-    @property
-    def word_count(self) -> int:
-        return len(self.text.split())
+    def __post_init__(self):
+        self.word_count = len(self.text.split())
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentMetadata:
     """Metadata extracted from PDF."""
     
@@ -47,6 +135,8 @@ class DocumentMetadata:
     modification_date: Optional[str] = None
     page_count: int = 0
     file_size: int = 0  # bytes
+    textless_pages: int = 0  # Pages with (almost) no extractable text
+    scanned_pages: int = 0  # Image-only scans skipped before text extraction
     
     def to_dict(self) -> dict:
         return {
@@ -59,6 +149,8 @@ class DocumentMetadata:
             "modification_date": self.modification_date,
             "page_count": self.page_count,
             "file_size": self.file_size,
+            "textless_pages": self.textless_pages,
+            "scanned_pages": self.scanned_pages,
         }
 
 
@@ -69,25 +161,55 @@ class ParsedDocument:
     filename: str
     metadata: DocumentMetadata
     pages: list[PageContent]
-    full_text: str
     
-    # Page offset index for fast lookups
-    _page_offsets: list[tuple[int, int, int]] = field(default_factory=list)
+    # Joined text, built lazily from pages
+    _full_text: Optional[str] = None
+    
+    # Page offset index for fast lookups: page start offsets (ascending)
+    # and the matching page numbers
+    _page_starts: array = field(default_factory=lambda: array("q"))
+    _page_numbers: array = field(default_factory=lambda: array("i"))
+    
+    # Per-page word counts stored contiguously, parallel to pages
+    _page_word_counts: array = field(default_factory=lambda: array("i"))
     
     def __post_init__(self):
-        """Build page offset index after initialization."""
-        if not self._page_offsets and self.pages:
-            self._page_offsets = [
-                (p.page_number, p.start_char, p.end_char) for p in self.pages
-            ]
+        """Build page offset and statistics indexes after initialization."""
+        if not self._page_starts and self.pages:
+            self._page_starts = array("q", (p.start_char for p in self.pages))
+            self._page_numbers = array("i", (p.page_number for p in self.pages))
+        if not self._page_word_counts and self.pages:
+            self._page_word_counts = array(
+                "i", (p.word_count for p in self.pages)
+            )
     
     @property
     def total_words(self) -> int:
-        return sum(p.word_count for p in self.pages)
+        return sum(self._page_word_counts)
+    
+    @property
+    def full_text(self) -> str:
+        """
+        Complete document text with pages joined by blank lines.
+        
+        Built from the pages on first access, so callers that only need
+        per-page text never pay for it.
+        """
+        if self._full_text is None:
+            self._full_text = _PAGE_SEPARATOR.join(p.text for p in self.pages)
+        return self._full_text
     
     @property
     def total_characters(self) -> int:
-        return len(self.full_text)
+        if self._full_text is not None:
+            return len(self._full_text)
+        if not self.pages:
+            return 0
+        # Page texts plus the separators between them
+        return (
+            sum(len(p.text) for p in self.pages)
+            + len(_PAGE_SEPARATOR) * (len(self.pages) - 1)
+        )
     
     def get_page_for_char_position(self, char_pos: int) -> int:
         """
@@ -99,16 +221,25 @@ class ParsedDocument:
         Returns:
             Page number (1-indexed)
         """
-        for page_num, start, end in self._page_offsets:
-            if start <= char_pos < end:
-                return page_num
-        
-        # If position is beyond all pages, return last page
-        if self._page_offsets and char_pos >= self._page_offsets[-1][2]:
-            return self._page_offsets[-1][0]
+        idx = self._page_index(char_pos)
+        if idx >= 0:
+            return self._page_numbers[idx]
         
         return 1  # Default to first page
     
+    def _page_index(self, char_pos: int, lo: int = 0) -> int:
+        """
+        Index of the last page starting at or before char_pos (-1 if none).
+        
+        Positions in the separator after a page, or beyond the end, map
+        to that page. ``lo`` narrows the search when a lower bound is known.
+        """
+        return bisect.bisect_right(self._page_starts, char_pos, lo) - 1
+    
+    def page_resolver(self) -> "PageResolver":
+        """Create a resolver for many page lookups in increasing order."""
+        return PageResolver(self._page_starts, self._page_numbers)
+    
     def get_page_range_for_text_span(
         self, start_char: int, end_char: int
     ) -> tuple[int, int]:
@@ -122,8 +253,71 @@ class ParsedDocument:
         Returns:
             Tuple of (start_page, end_page) - both 1-indexed
         """
-        start_page = self.get_page_for_char_position(start_char)
-        end_page = self.get_page_for_char_position(end_char - 1)  # -1 to stay within span
+        start_idx = self._page_index(start_char)
+        
+        # -1 to stay within span; the end page cannot precede the start page
+        end_pos = end_char - 1
+        end_idx = self._page_index(end_pos, max(start_idx, 0) if end_pos >= start_char else 0)
+        
+        start_page = self._page_numbers[start_idx] if start_idx >= 0 else 1
+        end_page = self._page_numbers[end_idx] if end_idx >= 0 else 1
+        return (start_page, end_page)
+
+
+class PageResolver:
+    """
+    Stateful page lookup for sequential span queries.
+    
+    Chunks are resolved in increasing character order, so consecutive
+    lookups usually land on the same or the next page. The resolver
+    remembers the last matched page index and checks it (and its
+    neighbour) before falling back to a bounded binary search.
+    
+    Each caller should use its own resolver; ParsedDocument itself stays
+    stateless and safe to share.
+    
+    Usage:
+        resolver = parsed_doc.page_resolver()
+        for chunk in chunks:
+            start_page, end_page = resolver.page_range(chunk.start_char, chunk.end_char)
+    """
+    
+    def __init__(self, page_starts: array, page_numbers: array):
+        self._starts = page_starts
+        self._numbers = page_numbers
+        self._last_idx = 0
+    
+    def _index(self, char_pos: int) -> int:
+        """Index of the last page starting at or before char_pos (-1 if none)."""
+        starts = self._starts
+        count = len(starts)
+        if not count or char_pos < starts[0]:
+            return -1
+        
+        idx = self._last_idx
+        if starts[idx] <= char_pos:
+            # Hit on the remembered page or the one right after it
+            if idx + 1 == count or char_pos < starts[idx + 1]:
+                return idx
+            if idx + 2 == count or char_pos < starts[idx + 2]:
+                self._last_idx = idx + 1
+                return idx + 1
+            idx = bisect.bisect_right(starts, char_pos, idx + 2) - 1
+        else:
+            idx = bisect.bisect_right(starts, char_pos, 0, idx) - 1
+        
+        self._last_idx = idx
+        return idx
+    
+    def page_for_char_position(self, char_pos: int) -> int:
+        """Page number (1-indexed) for a character position."""
+        idx = self._index(char_pos)
+        return self._numbers[idx] if idx >= 0 else 1
+    
+    def page_range(self, start_char: int, end_char: int) -> tuple[int, int]:
+        """Page range (start_page, end_page) for a text span."""
+        start_page = self.page_for_char_position(start_char)
+        end_page = self.page_for_char_position(end_char - 1)  # -1 to stay within span
         return (start_page, end_page)
 
 
@@ -147,22 +341,56 @@ class PDFParser:
         page = doc.get_page_for_char_position(1500)
     """
     
+    # Documents shorter than this are not worth a process pool
+    PARALLEL_MIN_PAGES = 64
+    
+    # parse_bytes spools inputs larger than this to disk before parsing
+    SPOOL_BYTES_THRESHOLD = 64 * 1024 * 1024
+    
+    # Pages with less cleaned text than this are treated as text-less
+    # (image-only / scanned) and skip table detection
+    MIN_PAGE_TEXT_CHARS = 20
+    
+    # Font-less pages whose images cover at least this fraction of the page
+    # are treated as scans (see _is_scanned)
+    SCANNED_IMAGE_COVERAGE = 0.8
+    
     def __init__(
         self,
         preserve_layout: bool = True,
         extract_images: bool = False,
         detect_tables: bool = True,
+        page_workers: int = 1,
+        skip_scanned: bool = True,
     ):
+        """
+        Initialize the parser.
+        
+        Args:
+            preserve_layout: Sort text blocks in reading order
+            extract_images: Count images per page
+            detect_tables: Run basic table detection
+            page_workers: Worker processes for page extraction on large
+                documents (1 = extract pages in-process)
+            skip_scanned: Skip text extraction on image-only scanned pages
+        """
         self.preserve_layout = preserve_layout
         self.extract_images = extract_images
         self.detect_tables = detect_tables
+        self.page_workers = page_workers
+        self.skip_scanned = skip_scanned
     
-    def parse(self, file_path: str | Path) -> ParsedDocument:
+    def parse(
+        self,
+        file_path: str | Path,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> ParsedDocument:
         """
         Parse a PDF file and extract all content.
         
         Args:
             file_path: Path to PDF file
+            on_progress: Called with (pages_done, total_pages) as pages finish
             
         Returns:
             ParsedDocument with full content and metadata
@@ -178,104 +406,205 @@ class PDFParser:
         logger.info(f"Parsing PDF: {file_path}")
         
         try:
-            doc = fitz.open(file_path)
-            
-            # Extract metadata
-            metadata = self._extract_metadata(doc, file_path)
-            
-            # Extract pages with character offset tracking
-            pages = []
-            all_text_parts = []
-            current_offset = 0
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_content = self._extract_page(page, page_num + 1)
-                
-                # Set character offsets
-                page_content.start_char = current_offset
-                page_content.end_char = current_offset + len(page_content.text)
+            with _fitz_lock:
+                doc = fitz.open(file_path)
                 
-                pages.append(page_content)
-                all_text_parts.append(page_content.text)
+                # Extract metadata
+                metadata = self._extract_metadata(doc, file_path)
                 
-                # Update offset (+2 for the "\n\n" separator between pages)
-                current_offset = page_content.end_char + 2
+                # Extract pages (offsets are assigned in _build_document)
+                pages = self._extract_pages(doc, str(file_path), on_progress)
+                doc.close()
             
-            doc.close()
-            
-            # Combine all text with page separators
-            full_text = "\n\n".join(all_text_parts)
+            parsed = self._build_document(file_path.name, metadata, pages)
             
             logger.info(
-                f"Parsed {len(pages)} pages, {len(full_text)} characters"
+                f"Parsed {len(pages)} pages, {parsed.total_characters} characters"
             )
             
-            return ParsedDocument(
-                filename=file_path.name,
-                metadata=metadata,
-                pages=pages,
-                full_text=full_text,
-            )
+            return parsed
             
         except Exception as e:
             logger.error(f"Failed to parse PDF {file_path}: {e}")
             raise
     
-    def parse_bytes(self, data: bytes, filename: str = "document.pdf") -> ParsedDocument:
+    def parse_many(
+        self,
+        file_paths: list[str | Path],
+        workers: Optional[int] = None,
+    ) -> list[ParsedDocument]:
+        """
+        Parse several PDF files in parallel worker processes.
+        
+        Args:
+            file_paths: Paths to PDF files
+            workers: Number of worker processes (defaults to CPU count)
+            
+        Returns:
+            ParsedDocuments in the same order as file_paths
+        """
+        workers = min(workers or os.cpu_count() or 1, len(file_paths))
+        if workers <= 1:
+            return [self.parse(path) for path in file_paths]
+        
+        logger.info(f"Parsing {len(file_paths)} PDFs with {workers} workers")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.parse, file_paths))
+    
+    def parse_bytes(
+        self,
+        data: PDFBuffer,
+        filename: str = "document.pdf",
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> ParsedDocument:
         """
         Parse PDF from bytes (e.g., uploaded file).
         
+        The buffer is parsed in memory; only inputs above
+        SPOOL_BYTES_THRESHOLD are spooled to a temp file (see
+        _parse_spooled).
+        
         Args:
-            data: PDF file content as bytes
+            data: PDF file content (bytes, bytearray or memoryview)
             filename: Name to use for the document
+            on_progress: Called with (pages_done, total_pages) as pages finish
             
         Returns:
             ParsedDocument with full content and metadata
         """
         logger.info(f"Parsing PDF from bytes: {filename}")
         
+        if len(data) > self.SPOOL_BYTES_THRESHOLD:
+            return self._parse_spooled(data, filename, on_progress)
+        
         try:
-            doc = fitz.open(stream=data, filetype="pdf")
-            
-            # Extract metadata
-            metadata = self._extract_metadata_from_doc(doc)
-            metadata.file_size = len(data)
-            
-            # Extract pages with character offset tracking
-            pages = []
-            all_text_parts = []
-            current_offset = 0
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_content = self._extract_page(page, page_num + 1)
+            with _fitz_lock:
+                doc = fitz.open(stream=data, filetype="pdf")
                 
-                # Set character offsets
-                page_content.start_char = current_offset
-                page_content.end_char = current_offset + len(page_content.text)
+                # Extract metadata
+                metadata = self._extract_metadata_from_doc(doc)
+                metadata.file_size = len(data)
                 
-                pages.append(page_content)
-                all_text_parts.append(page_content.text)
-                
-                # Update offset (+2 for the "\n\n" separator)
-                current_offset = page_content.end_char + 2
-            
-            doc.close()
+                # Extract pages (offsets are assigned in _build_document)
+                pages = self._extract_pages(doc, data, on_progress)
+                doc.close()
             
-            full_text = "\n\n".join(all_text_parts)
-            
-            return ParsedDocument(
-                filename=filename,
-                metadata=metadata,
-                pages=pages,
-                full_text=full_text,
-            )
+            return self._build_document(filename, metadata, pages)
             
         except Exception as e:
             logger.error(f"Failed to parse PDF bytes: {e}")
             raise
     
+    def _parse_spooled(
+        self,
+        data: PDFBuffer,
+        filename: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> ParsedDocument:
+        """
+        Parse large PDF bytes by spooling them to a temp file first.
+        
+        Opening by path lets MuPDF read the file on demand instead of
+        holding its own in-memory copy next to ``data``, and lets page
+        workers reopen the file rather than receive the bytes.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(data)
+        
+        try:
+            parsed = self.parse(tmp.name, on_progress)
+        finally:
+            Path(tmp.name).unlink(missing_ok=True)
+        
+        parsed.filename = filename
+        return parsed
+    
+    def _extract_pages(
+        self,
+        doc: fitz.Document,
+        source: str | PDFBuffer,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> list[PageContent]:
+        """
+        Extract every page of an open document, in page order.
+        
+        Large documents are split into one contiguous page range per
+        worker process; each worker reopens the PDF from ``source``.
+        """
+        page_count = len(doc)
+        workers = min(self.page_workers, page_count)
+        
+        if workers <= 1 or page_count < self.PARALLEL_MIN_PAGES:
+            pages = []
+            for page_num in range(page_count):
+                pages.append(self._extract_page(doc[page_num], page_num + 1))
+                if on_progress:
+                    on_progress(page_num + 1, page_count)
+            return pages
+        
+        options = {
+            "preserve_layout": self.preserve_layout,
+            "extract_images": self.extract_images,
+            "detect_tables": self.detect_tables,
+            "skip_scanned": self.skip_scanned,
+        }
+        if isinstance(source, memoryview):
+            # Views can't be pickled to the workers
+            source = source.tobytes()
+        step = -(-page_count // workers)  # ceil division
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        
+        pages: list[PageContent] = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_extract_page_range, source, options, start, stop)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                pages.extend(future.result())
+                if on_progress:
+                    on_progress(len(pages), page_count)
+        
+        return pages
+    
+    def _build_document(
+        self,
+        filename: str,
+        metadata: DocumentMetadata,
+        pages: list[PageContent],
+    ) -> ParsedDocument:
+        """
+        Assemble a ParsedDocument from extracted pages.
+        
+        Assigns each page's character offsets in the joined text, where
+        pages are separated by _PAGE_SEPARATOR.
+        """
+        metadata.textless_pages = sum(
+            1 for page in pages if len(page.text) < self.MIN_PAGE_TEXT_CHARS
+        )
+        metadata.scanned_pages = sum(1 for page in pages if page.scanned)
+        
+        # Start offsets in one pass: each page starts after the previous
+        # page's text and the separator
+        sep_len = len(_PAGE_SEPARATOR)
+        starts = array("q", accumulate(
+            (len(page.text) + sep_len for page in pages[:-1]), initial=0,
+        )) if pages else array("q")
+        for page, start in zip(pages, starts):
+            page.start_char = start
+            page.end_char = start + len(page.text)
+        page_numbers = array("i", (page.page_number for page in pages))
+        
+        # full_text is joined from the pages on first access
+        return ParsedDocument(
+            filename=filename,
+            metadata=metadata,
+            pages=pages,
+            _page_starts=starts,
+            _page_numbers=page_numbers,
+        )
+    
     def _extract_metadata(
         self, doc: fitz.Document, file_path: Path
     ) -> DocumentMetadata:
@@ -301,11 +630,23 @@ class PDFParser:
     
     def _extract_page(self, page: fitz.Page, page_number: int) -> PageContent:
         """Extract content from a single page."""
+        # Image-only scans yield no text; skip building the text page
+        if self.skip_scanned and self._is_scanned(page):
+            return PageContent(
+                page_number=page_number,
+                text="",
+                images=len(page.get_images()) if self.extract_images else 0,
+                scanned=True,
+            )
+        
+        # Parse the content stream once; text and table detection share it
+        textpage = page.get_textpage(flags=_TEXT_FLAGS)
+        
         # Extract text with layout preservation
         if self.preserve_layout:
-            text = page.get_text("text", sort=True)
+            text = page.get_text("text", sort=True, textpage=textpage)
         else:
-            text = page.get_text("text")
+            text = page.get_text("text", textpage=textpage)
         
         # Clean up text
         text = self._clean_text(text)
@@ -313,10 +654,11 @@ class PDFParser:
         # Count images
         image_count = len(page.get_images()) if self.extract_images else 0
         
-        # Extract tables (basic detection)
+        # Extract tables (basic detection); image-only or scanned pages
+        # have next to no text, so skip the extra content-stream walk
         tables = []
-        if self.detect_tables:
-            tables = self._detect_tables(page)
+        if self.detect_tables and len(text) >= self.MIN_PAGE_TEXT_CHARS:
+            tables = self._detect_tables(page, textpage)
         
         return PageContent(
             page_number=page_number,
@@ -325,59 +667,84 @@ class PDFParser:
             images=image_count,
         )
     
+    def _is_scanned(self, page: fitz.Page) -> bool:
+        """
+        Check whether a page is an image-only scan.
+        
+        Pages that reference any font (including an invisible OCR text
+        layer) are never treated as scans, so no extractable text is lost.
+        The font check only reads the page resources; image coverage is
+        measured just for the font-less pages that pass it.
+        """
+        if page.get_fonts():
+            return False
+        
+        page_rect = page.rect
+        page_area = page_rect.get_area()
+        if not page_area:
+            return False
+        
+        covered = sum(
+            (fitz.Rect(info["bbox"]) & page_rect).get_area()
+            for info in page.get_image_info()
+        )
+        return covered / page_area >= self.SCANNED_IMAGE_COVERAGE
+    
     def _clean_text(self, text: str) -> str:
         """Clean extracted text."""
-        # Remove excessive whitespace
-        lines = text.split("\n")
-        cleaned_lines = []
+        # Drop carriage returns and form feeds emitted by MuPDF
+        text = text.translate(_CLEAN_TRANSLATION)
         
-        for line in lines:
-            # Strip trailing whitespace
-            line = line.rstrip()
-            # Skip completely empty lines if previous was also empty
-            if line or (cleaned_lines and cleaned_lines[-1]):
-                cleaned_lines.append(line)
+        # Strip trailing whitespace from every line
+        text = _TRAILING_WS_RE.sub("", text)
         
-        # Join and normalize multiple blank lines
-        text = "\n".join(cleaned_lines)
+        # Collapse runs of blank lines into a single blank line
+        text = _BLANK_LINES_RE.sub("\n\n", text)
         
         # Replace multiple spaces with single space
-        while "  " in text:
-            text = text.replace("  ", " ")
+        text = _MULTI_SPACE_RE.sub(" ", text)
         
         return text.strip()
     
-    def _detect_tables(self, page: fitz.Page) -> list[str]:
+    def _detect_tables(
+        self, page: fitz.Page, textpage: Optional[fitz.TextPage] = None
+    ) -> list[str]:
         """
         Basic table detection using text blocks analysis.
         
+        Args:
+            page: Page to analyze
+            textpage: Already-parsed text of the page, reused if given
+        
         Note: For production, consider using camelot-py or tabula-py
         for more sophisticated table extraction.
         """
         tables = []
         
         # Get text blocks
-        blocks = page.get_text("dict")["blocks"]
+        blocks = page.get_text("dict", textpage=textpage)["blocks"]
         
         # Look for aligned text blocks that might be tables
         # This is a simplified heuristic
         for block in blocks:
-            if block["type"] == 0:  # Text block
-                lines = block.get("lines", [])
-                if len(lines) >= 3:
-                    # Check if lines have similar structure (potential table)
-                    span_counts = [len(line.get("spans", [])) for line in lines]
-                    if len(set(span_counts)) == 1 and span_counts[0] >= 2:
-                        # Might be a table - extract text
-                        table_text = []
-                        for line in lines:
-                            row = " | ".join(
-                                span.get("text", "")
-                                for span in line.get("spans", [])
-                            )
-                            table_text.append(row)
-                        if table_text:
-                            tables.append("\n".join(table_text))
+            if block["type"] != 0:  # Not a text block
+                continue
+            
+            lines = block.get("lines", ())
+            if len(lines) < 3:
+                continue
+            
+            # Check if lines have similar structure (potential table)
+            span_counts = tuple(len(line.get("spans", ())) for line in lines)
+            if span_counts[0] < 2 or span_counts.count(span_counts[0]) != len(span_counts):
+                continue
+            
+            # Might be a table - extract text
+            table_text = [
+                " | ".join(span.get("text", "") for span in line.get("spans", ()))
+                for line in lines
+            ]
+            tables.append("\n".join(table_text))
         
         return tables
     
@@ -395,14 +762,23 @@ class PDFParser:
             Text content of the page
         """
         file_path = Path(file_path)
-        doc = fitz.open(file_path)
-        
-        if page_number < 1 or page_number > len(doc):
-            doc.close()
-            raise ValueError(f"Invalid page number: {page_number}")
         
-        page = doc[page_number - 1]
-        text = page.get_text("text", sort=True)
-        doc.close()
+        with _fitz_lock:
+            # Handle is cached and owned by _open_document; do not close it here
+            doc = _open_document(str(file_path), file_path.stat().st_mtime)
+            
+            if page_number < 1 or page_number > len(doc):
+                raise ValueError(f"Invalid page number: {page_number}")
+            
+            page = doc[page_number - 1]
+            text = page.get_text("text", flags=_TEXT_FLAGS, sort=True)
         
         return self._clean_text(text)
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Close and forget document handles cached by get_page_text."""
+        with _fitz_lock:
+            while _open_documents:
+                _, doc = _open_documents.popitem()
+                doc.close()
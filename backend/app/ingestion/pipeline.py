@@ -11,23 +11,48 @@ All extraction (entities + metadata) happens via LLM in a single call per chunk.
 Behavior is controlled by ExtractionStrategy - no fallbacks, strategy-driven only.
 """
 
+import asyncio
+import copy
+import hashlib
 import logging
+import secrets
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
-from app.ingestion.pdf_parser import PDFParser, ParsedDocument
+from app.ingestion.pdf_parser import PDFBuffer, PDFParser, ParsedDocument
 from app.ingestion.chunker import TextChunker, TextChunk
 from app.extraction.dynamic_extractor import DynamicExtractor, ExtractionResult, ChunkMetadata
-from app.schema.models import DynamicGraph, DynamicEntity
+from app.schema.models import DynamicGraph, DynamicEntity, DynamicRelationship
 from app.graph.dynamic_repository import DynamicGraphRepository
 from app.strategies import get_strategy_manager, ExtractionStrategy
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Timestamp part of document IDs, re-formatted at most once per second
+_id_stamp: tuple[int, str] = (0, "")
 
-@dataclass
+
+def _new_document_id(name: str, started_at: datetime) -> str:
+    """
+    Build a unique document ID: doc_<name>_<YYYYmmdd_HHMMSS>_<random>.
+    
+    The timestamp (local time) comes from the ingestion's started_at, so
+    one clock read serves both. The random suffix keeps IDs unique when
+    several documents with the same name are ingested within the same
+    second.
+    """
+    global _id_stamp
+    second = int(started_at.timestamp())
+    if _id_stamp[0] != second:
+        _id_stamp = (second, started_at.astimezone().strftime("%Y%m%d_%H%M%S"))
+    return f"doc_{name}_{_id_stamp[1]}_{secrets.token_hex(4)}"
+
+
+@dataclass(slots=True)
 class IngestionStatus:
     """Status of document ingestion."""
     
@@ -38,9 +63,14 @@ class IngestionStatus:
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
     
+    # Set when a failed ingest could not remove the graph it had written,
+    # leaving orphaned entities behind
+    cleanup_error: Optional[str] = None
+    
     # Progress metrics
     pages_parsed: int = 0
     total_pages: int = 0
+    scanned_pages_skipped: int = 0
     chunks_created: int = 0
     chunks_processed: int = 0
     total_chunks: int = 0
@@ -58,10 +88,12 @@ class IngestionStatus:
             "started_at": self.started_at.isoformat(),
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "error": self.error,
+            "cleanup_error": self.cleanup_error,
             "extraction_strategy": self.extraction_strategy,
             "progress": {
                 "pages_parsed": self.pages_parsed,
                 "total_pages": self.total_pages,
+                "scanned_pages_skipped": self.scanned_pages_skipped,
                 "chunks_created": self.chunks_created,
                 "chunks_processed": self.chunks_processed,
                 "total_chunks": self.total_chunks,
@@ -71,7 +103,7 @@ class IngestionStatus:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class IngestionResult:
     """Result of document ingestion."""
     
@@ -124,6 +156,31 @@ class IngestionPipeline:
                 print(f"  Chunk {meta.chunk_index}: {meta.section_heading}")
     """
     
+    # Upper bound on tracked ingestion statuses; the oldest finished ones
+    # are evicted first, in-flight ingestions are never dropped
+    MAX_TRACKED_INGESTIONS = 1000
+    
+    # Terminal states whose statuses may be evicted
+    _FINISHED_STATES = frozenset({"completed", "failed"})
+    
+    # Upper bound on chunk text per batched extraction call, keeping batch
+    # prompts well inside typical context windows
+    MAX_BATCH_CHARS = 16000
+    
+    # Expected extraction response per chunk, used to keep a batch's JSON
+    # within the extraction client's max_tokens: a fixed metadata block plus
+    # entities and relationships, whose count grows with the chunk text
+    # (each entity also quotes its source_text back)
+    BATCH_METADATA_TOKENS = 250
+    BATCH_OUTPUT_TOKENS_PER_CHAR = 0.5
+    
+    # Extraction results kept for byte-identical chunk text (LRU)
+    MAX_CACHED_EXTRACTIONS = 512
+    
+    # Entities/relationships queued for the streaming graph writer before
+    # extraction waits for it to catch up
+    MAX_PENDING_GRAPH_WRITES = 1000
+    
     def __init__(
         self,
         pdf_parser: Optional[PDFParser] = None,
@@ -132,6 +189,7 @@ class IngestionPipeline:
         graph_repo: Optional[DynamicGraphRepository] = None,
         schema_name: Optional[str] = None,
         extraction_strategy: Optional[ExtractionStrategy] = None,
+        max_concurrent_extractions: Optional[int] = None,
     ):
         self.pdf_parser = pdf_parser or PDFParser()
         self.chunker = chunker or TextChunker()
@@ -147,8 +205,20 @@ class IngestionPipeline:
             extraction_strategy=self.extraction_strategy,
         )
         
-        # Track active ingestions
-        self._active_ingestions: dict[str, IngestionStatus] = {}
+        # Upper bound on in-flight chunk extraction (LLM) calls per document
+        self.max_concurrent_extractions = (
+            max_concurrent_extractions or settings.extraction_max_concurrency
+        )
+        
+        # Track ingestions in start order (bounded, see _track_ingestion)
+        self._active_ingestions: OrderedDict[str, IngestionStatus] = OrderedDict()
+        
+        # Extraction results by chunk text + extraction settings (LRU)
+        self._extraction_cache: OrderedDict[str, ExtractionResult] = OrderedDict()
+        
+        # Concurrent ingestions queue here for their parse step instead of
+        # parking worker threads on the parser's fitz lock
+        self._parse_lock = asyncio.Lock()
     
     async def ingest_file(
         self,
@@ -166,25 +236,29 @@ class IngestionPipeline:
             IngestionResult with full details
         """
         file_path = Path(file_path)
-        document_id = f"doc_{file_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        started_at = datetime.now(timezone.utc)
+        document_id = _new_document_id(file_path.stem, started_at)
         
         status = IngestionStatus(
             document_id=document_id,
             filename=file_path.name,
             status="pending",
-            started_at=datetime.now(),
+            started_at=started_at,
             extraction_strategy=getattr(self.extraction_strategy, 'name', 'custom'),
         )
-        self._active_ingestions[document_id] = status
+        self._track_ingestion(status)
         
         try:
             # Step 1: Parse PDF
             status.status = "parsing"
             logger.info(f"Parsing document: {file_path}")
             
-            parsed_doc = self.pdf_parser.parse(file_path)
+            parsed_doc = await self._parse_off_loop(
+                self.pdf_parser.parse, file_path, status=status
+            )
             status.pages_parsed = parsed_doc.metadata.page_count
             status.total_pages = parsed_doc.metadata.page_count
+            status.scanned_pages_skipped = parsed_doc.metadata.scanned_pages
             
             logger.info(
                 f"Parsed {parsed_doc.metadata.page_count} pages, "
@@ -193,7 +267,8 @@ class IngestionPipeline:
             
             # Step 2: Create chunks
             status.status = "chunking"
-            chunks = self.chunker.chunk_document(
+            chunks = await asyncio.to_thread(
+                self.chunker.chunk_document,
                 parsed_doc,
                 document_id=document_id,
             )
@@ -206,9 +281,16 @@ class IngestionPipeline:
             status.status = "extracting"
             logger.info("Extracting entities and metadata from chunks via LLM")
             
-            merged_graph, all_chunk_metadata = await self._extract_from_chunks(
-                chunks, file_path.name, status
-            )
+            # Entities and relationships go to Neo4j while extraction is still running
+            stream_graph = store_in_graph and self.graph_repo is not None
+            if stream_graph:
+                merged_graph, all_chunk_metadata = await self._extract_streaming(
+                    chunks, file_path.name, status
+                )
+            else:
+                merged_graph, all_chunk_metadata = await self._extract_from_chunks(
+                    chunks, file_path.name, status
+                )
             
             logger.info(
                 f"Extracted {merged_graph.entity_count} entities, "
@@ -229,18 +311,16 @@ class IngestionPipeline:
                         document_id, file_path.name, parsed_doc, chunks
                     )
                 
-                # Store entities and relationships
-                await self.graph_repo.store_graph(merged_graph)
-                
-                # Link entities to chunks
+                # Entities and relationships were stored during extraction;
+                # link entities to chunks
                 if self.extraction_strategy.entity_linking.enabled and chunks:
-                    await self._link_entities_to_chunks(merged_graph, chunks)
+                    await self._link_entities_to_chunks(merged_graph)
                 
                 logger.info("Successfully stored in Neo4j")
             
             # Complete
             status.status = "completed"
-            status.completed_at = datetime.now()
+            status.completed_at = datetime.now(timezone.utc)
             
             return IngestionResult(
                 success=True,
@@ -256,7 +336,7 @@ class IngestionPipeline:
             logger.error(f"Ingestion failed: {e}")
             status.status = "failed"
             status.error = str(e)
-            status.completed_at = datetime.now()
+            status.completed_at = datetime.now(timezone.utc)
             
             return IngestionResult(
                 success=False,
@@ -264,25 +344,88 @@ class IngestionPipeline:
                 status=status,
             )
     
+    async def ingest_files(
+        self,
+        file_paths: list[str | Path],
+        store_in_graph: bool = True,
+        max_concurrent: int = 4,
+    ) -> list[IngestionResult]:
+        """
+        Ingest several PDF files concurrently.
+        
+        At most ``max_concurrent`` files are in flight at once. Parsing is
+        serialized (one PDF at a time, see _parse_off_loop); only the later
+        stages, chiefly LLM extraction, run concurrently, so parsing one
+        file overlaps with extraction of others. A failure in one file is
+        reported in its result and does not cancel the rest.
+        
+        Args:
+            file_paths: Paths to PDF files
+            store_in_graph: Whether to store results in Neo4j
+            max_concurrent: Maximum number of files processed at once
+            
+        Returns:
+            IngestionResults in the same order as file_paths
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def ingest_one(file_path: str | Path) -> IngestionResult:
+            async with semaphore:
+                return await self.ingest_file(file_path, store_in_graph=store_in_graph)
+        
+        outcomes = await asyncio.gather(
+            *(ingest_one(path) for path in file_paths),
+            return_exceptions=True,
+        )
+        
+        results = []
+        for file_path, outcome in zip(file_paths, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Ingestion failed for {file_path}: {outcome}")
+                filename = Path(file_path).name
+                failed_at = datetime.now(timezone.utc)
+                outcome = IngestionResult(
+                    success=False,
+                    document_id="",
+                    status=IngestionStatus(
+                        document_id="",
+                        filename=filename,
+                        status="failed",
+                        started_at=failed_at,
+                        completed_at=failed_at,
+                        error=str(outcome),
+                    ),
+                )
+            results.append(outcome)
+        
+        logger.info(
+            f"Batch ingestion: {sum(r.success for r in results)}/{len(results)} succeeded"
+        )
+        return results
+    
     async def ingest_bytes(
         self,
-        data: bytes,
+        data: PDFBuffer,
         filename: str,
         store_in_graph: bool = True,
     ) -> IngestionResult:
         """
         Ingest a PDF from bytes (uploaded file).
+        
+        The content is parsed straight from memory; pass a bytearray or
+        memoryview as-is rather than copying it into bytes first.
         """
-        document_id = f"doc_{Path(filename).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        started_at = datetime.now(timezone.utc)
+        document_id = _new_document_id(Path(filename).stem, started_at)
         
         status = IngestionStatus(
             document_id=document_id,
             filename=filename,
             status="pending",
-            started_at=datetime.now(),
+            started_at=started_at,
             extraction_strategy=getattr(self.extraction_strategy, 'name', 'custom'),
         )
-        self._active_ingestions[document_id] = status
+        self._track_ingestion(status)
         
         try:
             # ═══════════════════════════════════════════════════════════════
@@ -301,9 +444,12 @@ class IngestionPipeline:
             logger.info("┌─ STEP 1: Parse PDF")
             logger.info("│  Input:  PDF bytes")
             
-            parsed_doc = self.pdf_parser.parse_bytes(data, filename)
+            parsed_doc = await self._parse_off_loop(
+                self.pdf_parser.parse_bytes, data, filename, status=status
+            )
             status.pages_parsed = parsed_doc.metadata.page_count
             status.total_pages = parsed_doc.metadata.page_count
+            status.scanned_pages_skipped = parsed_doc.metadata.scanned_pages
             
             logger.info(f"│  Output: {parsed_doc.metadata.page_count} pages, {parsed_doc.total_characters:,} characters")
             logger.info("└─ ✓ Parsing complete")
@@ -317,7 +463,8 @@ class IngestionPipeline:
             chunking_cfg = self.extraction_strategy.chunking
             logger.info(f"│  Strategy: {chunking_cfg.strategy} (size={chunking_cfg.chunk_size}, overlap={chunking_cfg.chunk_overlap})")
             
-            chunks = self.chunker.chunk_document(
+            chunks = await asyncio.to_thread(
+                self.chunker.chunk_document,
                 parsed_doc,
                 extraction_strategy=self.extraction_strategy,
                 document_id=document_id,
@@ -339,9 +486,16 @@ class IngestionPipeline:
             logger.info(f"│  Chunks to process: {len(chunks)}")
             logger.info("│")
             
-            merged_graph, all_chunk_metadata = await self._extract_from_chunks(
-                chunks, filename, status
-            )
+            # Entities and relationships go to Neo4j while extraction is still running
+            stream_graph = store_in_graph and self.graph_repo is not None
+            if stream_graph:
+                merged_graph, all_chunk_metadata = await self._extract_streaming(
+                    chunks, filename, status
+                )
+            else:
+                merged_graph, all_chunk_metadata = await self._extract_from_chunks(
+                    chunks, filename, status
+                )
             
             # Apply metadata to chunks
             self._apply_metadata_to_chunks(chunks, all_chunk_metadata)
@@ -372,12 +526,14 @@ class IngestionPipeline:
                     if self.extraction_strategy.chunk_linking.sequential:
                         logger.info("│  ├─ Creating NEXT/PREV chunk links")
                 
-                logger.info(f"│  ├─ Storing {merged_graph.entity_count} entity nodes")
-                await self.graph_repo.store_graph(merged_graph)
+                logger.info(
+                    f"│  ├─ {merged_graph.entity_count} entities, "
+                    f"{merged_graph.relationship_count} relationships stored during extraction"
+                )
                 
                 if self.extraction_strategy.entity_linking.enabled and chunks:
                     logger.info("│  ├─ Creating EXTRACTED_FROM links")
-                    await self._link_entities_to_chunks(merged_graph, chunks)
+                    await self._link_entities_to_chunks(merged_graph)
                 
                 logger.info("└─ ✓ Storage complete")
             
@@ -385,7 +541,7 @@ class IngestionPipeline:
             # COMPLETE
             # ─────────────────────────────────────────────────────────────
             status.status = "completed"
-            status.completed_at = datetime.now()
+            status.completed_at = datetime.now(timezone.utc)
             
             elapsed = (status.completed_at - status.started_at).total_seconds()
             logger.info("")
@@ -416,7 +572,7 @@ class IngestionPipeline:
             logger.error(f"Ingestion failed: {e}")
             status.status = "failed"
             status.error = str(e)
-            status.completed_at = datetime.now()
+            status.completed_at = datetime.now(timezone.utc)
             
             return IngestionResult(
                 success=False,
@@ -433,13 +589,14 @@ class IngestionPipeline:
         """
         Ingest raw text directly (for testing or non-PDF sources).
         """
-        document_id = f"doc_{document_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        started_at = datetime.now(timezone.utc)
+        document_id = _new_document_id(document_name, started_at)
         
         status = IngestionStatus(
             document_id=document_id,
             filename=document_name,
             status="extracting",
-            started_at=datetime.now(),
+            started_at=started_at,
             extraction_strategy=getattr(self.extraction_strategy, 'name', 'custom'),
         )
         
@@ -476,7 +633,7 @@ class IngestionPipeline:
                 await self.graph_repo.store_graph(graph)
             
             status.status = "completed"
-            status.completed_at = datetime.now()
+            status.completed_at = datetime.now(timezone.utc)
             
             return IngestionResult(
                 success=True,
@@ -499,15 +656,46 @@ class IngestionPipeline:
                 status=status,
             )
     
+    async def _parse_off_loop(
+        self,
+        parse_fn,
+        *args,
+        status: IngestionStatus,
+    ) -> ParsedDocument:
+        """
+        Run a (CPU-bound) PDFParser call in a worker thread.
+        
+        Keeps the event loop free, so parsing one document overlaps with
+        LLM extraction of others. PyMuPDF is not thread-safe, so only one
+        parse runs at a time; the others wait here on the event loop. Page
+        progress is reported on ``status``.
+        """
+        def on_progress(pages_done: int, total_pages: int) -> None:
+            status.pages_parsed = pages_done
+            status.total_pages = total_pages
+        
+        async with self._parse_lock:
+            return await asyncio.to_thread(parse_fn, *args, on_progress)
+    
     async def _extract_from_chunks(
         self,
         chunks: list[TextChunk],
         source_document: str,
         status: IngestionStatus,
+        entity_sink: Optional[asyncio.Queue] = None,
     ) -> tuple[DynamicGraph, list[ChunkMetadata]]:
         """
         Extract entities and metadata from each chunk via LLM.
         
+        Args:
+            chunks: Chunks to extract from
+            source_document: Source document identifier
+            status: Ingestion status to update with progress
+            entity_sink: Optional queue receiving each newly merged
+                (deduplicated) entity as soon as its chunk is merged,
+                followed by the chunk's relationships whose endpoints
+                have both been merged
+        
         Returns:
             Tuple of (merged_graph, list_of_chunk_metadata)
         """
@@ -531,143 +719,195 @@ class IngestionPipeline:
         skipped_entities = 0
         stored_entities = 0
         
-        for i, chunk in enumerate(chunks):
-            chunk_num = i + 1
-            
-            # ───────────────────────────────────────────────────────────
-            # STEP 3a: Extract from chunk (LLM call)
-            # ───────────────────────────────────────────────────────────
-            result = await self.extractor.extract_chunk(
-                chunk_text=chunk.text,
-                chunk_id=chunk.id,
-                chunk_index=chunk.chunk_index,
-                source_document=source_document,
-            )
-            
-            # Get chunk context for logging
-            page = chunk.metadata.get("page_number", "?")
-            section = result.chunk_metadata.section_heading if result.chunk_metadata else None
-            section_short = section[:25] + "..." if section and len(section) > 25 else section
-            
-            # ───────────────────────────────────────────────────────────
-            # Log: What was EXTRACTED
-            # ───────────────────────────────────────────────────────────
-            entity_summary = []
-            for etype, elist in result.graph.entities.items():
-                if elist:
-                    entity_summary.append(f"{len(elist)} {etype}")
-            
-            logger.info(f"│")
-            logger.info(f"│  ┌─ Chunk {chunk_num}/{total_chunks} (Page {page})")
-            if section_short:
-                logger.info(f"│  │  Section: {section_short}")
-            
-            if entity_summary:
-                logger.info(f"│  │  📦 Extracted: {', '.join(entity_summary)}")
-            else:
-                logger.info(f"│  │  📦 Extracted: (no entities found)")
-            
-            if result.graph.relationships:
-                logger.info(f"│  │  🔗 Relations: {len(result.graph.relationships)}")
-            
-            # ───────────────────────────────────────────────────────────
-            # Log: What was NOT VALIDATED (errors/warnings)
-            # ───────────────────────────────────────────────────────────
-            has_errors = len(result.validation_errors) > 0
-            has_warnings = len(result.validation_warnings) > 0
-            
-            if has_errors or has_warnings:
-                logger.info(f"│  │")
-                logger.info(f"│  │  ⚠️  Validation Issues:")
+        # ───────────────────────────────────────────────────────────
+        # STEP 3a: Extract from chunks (LLM calls, bounded concurrency)
+        # ───────────────────────────────────────────────────────────
+        # Rate-limit-sensitive strategies may cap concurrency below the default
+        semaphore = asyncio.Semaphore(
+            strategy.max_concurrency or self.max_concurrent_extractions
+        )
+        
+        async def extract_batch(batch: list[TextChunk]) -> list[ExtractionResult]:
+            async with semaphore:
+                results = await self.extractor.extract_chunks_batch(
+                    [(chunk.text, chunk.id, chunk.chunk_index) for chunk in batch],
+                    source_document=source_document,
+                )
+            # Count completions as they happen (merging below is in order);
+            # the event loop runs this without interleaving, so no lock
+            status.chunks_processed += len(batch)
+            return results
+        
+        # Identical chunks (repeated headers/footers, boilerplate, text
+        # seen in an earlier document) are extracted once and then reused
+        cache_scope = self._extraction_cache_scope()
+        keys = [self._extraction_cache_key(cache_scope, chunk) for chunk in chunks]
+        unique: dict[str, TextChunk] = {}
+        for chunk, key in zip(chunks, keys):
+            if key not in unique and key not in self._extraction_cache:
+                unique[key] = chunk
+        status.chunks_processed += len(chunks) - len(unique)
+        
+        batches = self._batch_chunks(list(unique.values()), strategy.batch_size)
+        tasks = [asyncio.create_task(extract_batch(batch)) for batch in batches]
+        # (task, position in its batch) for every chunk to extract
+        slot_by_key = dict(zip(unique, (
+            (task, offset)
+            for task, batch in zip(tasks, batches)
+            for offset in range(len(batch))
+        )))
+        
+        try:
+            for i, (chunk, key) in enumerate(zip(chunks, keys)):
+                chunk_num = i + 1
                 
-                for err in result.validation_errors:
-                    logger.info(f"│  │  │  ❌ ERROR: {err}")
-                    total_errors += 1
+                # Results are merged in chunk order as they become available
+                slot = slot_by_key.pop(key, None)
+                if slot is not None:
+                    task, offset = slot
+                    result = (await task)[offset]
+                    self._cache_extraction(key, result)
+                else:
+                    result = self._cached_extraction(key, chunk)
+                    if result is None:
+                        # The first occurrence failed and was not cached
+                        result = await self.extractor.extract_chunk(
+                            chunk_text=chunk.text,
+                            chunk_id=chunk.id,
+                            chunk_index=chunk.chunk_index,
+                            source_document=source_document,
+                        )
                 
-                for warn in result.validation_warnings:
-                    logger.info(f"│  │  │  ⚡ WARN: {warn}")
-                    total_warnings += 1
-            
-            # ───────────────────────────────────────────────────────────
-            # STEP 3b: Determine what to STORE based on validation mode
-            # ───────────────────────────────────────────────────────────
-            should_store = True
-            entities_to_store = []
-            
-            if validation_config.mode == "strict" and has_errors:
-                # Block all storage if any errors
-                should_store = False
-                logger.info(f"│  │")
-                logger.info(f"│  │  🚫 Storage: BLOCKED (strict mode + errors)")
-                skipped_entities += result.graph.entity_count
+                # Get chunk context for logging
+                page = chunk.metadata.get("page_number", "?")
+                section = result.chunk_metadata.section_heading if result.chunk_metadata else None
+                section_short = section[:25] + "..." if section and len(section) > 25 else section
                 
-            elif validation_config.mode == "store_valid":
-                # Filter to only valid entities
-                for entity_type, entities in result.graph.entities.items():
-                    for entity in entities:
-                        # Check if this entity has issues
-                        entity_has_issue = False
-                        for err in result.validation_errors:
-                            if entity.display_name in err or entity.id in err:
-                                entity_has_issue = True
-                                break
-                        
-                        if not entity_has_issue:
-                            entities_to_store.append((entity_type, entity))
-                        else:
-                            skipped_entities += 1
+                # ───────────────────────────────────────────────────────────
+                # Log: What was EXTRACTED
+                # ───────────────────────────────────────────────────────────
+                entity_summary = []
+                for etype, elist in result.graph.entities.items():
+                    if elist:
+                        entity_summary.append(f"{len(elist)} {etype}")
                 
-                if skipped_entities > 0:
-                    logger.info(f"│  │")
-                    logger.info(f"│  │  🔶 Storage: {len(entities_to_store)} valid, {result.graph.entity_count - len(entities_to_store)} skipped")
+                logger.info(f"│")
+                logger.info(f"│  ┌─ Chunk {chunk_num}/{total_chunks} (Page {page})")
+                if section_short:
+                    logger.info(f"│  │  Section: {section_short}")
                 
-            elif validation_config.mode == "ignore":
-                # Silent storage
-                pass
-            
-            # Default: warn mode - store everything
-            
-            # ───────────────────────────────────────────────────────────
-            # STEP 3c: Actually merge into graph
-            # ───────────────────────────────────────────────────────────
-            if should_store:
-                if validation_config.mode == "store_valid" and entities_to_store:
-                    # Store only validated entities
-                    for entity_type, entity in entities_to_store:
-                        entity.metadata["source_chunk_id"] = chunk.id
-                        entity.metadata["source_chunk_index"] = chunk.chunk_index
-                        merged_graph.add_entity(entity)
-                        stored_entities += 1
+                if entity_summary:
+                    logger.info(f"│  │  📦 Extracted: {', '.join(entity_summary)}")
                 else:
-                    # Store all entities
+                    logger.info(f"│  │  📦 Extracted: (no entities found)")
+                
+                if result.graph.relationships:
+                    logger.info(f"│  │  🔗 Relations: {len(result.graph.relationships)}")
+                
+                # ───────────────────────────────────────────────────────────
+                # Log: What was NOT VALIDATED (errors/warnings)
+                # ───────────────────────────────────────────────────────────
+                has_errors = len(result.validation_errors) > 0
+                has_warnings = len(result.validation_warnings) > 0
+                
+                if has_errors or has_warnings:
+                    logger.info(f"│  │")
+                    logger.info(f"│  │  ⚠️  Validation Issues:")
+                    
+                    for err in result.validation_errors:
+                        logger.info(f"│  │  │  ❌ ERROR: {err}")
+                        total_errors += 1
+                    
+                    for warn in result.validation_warnings:
+                        logger.info(f"│  │  │  ⚡ WARN: {warn}")
+                        total_warnings += 1
+                
+                # ───────────────────────────────────────────────────────────
+                # STEP 3b: Determine what to STORE based on validation mode
+                # ───────────────────────────────────────────────────────────
+                should_store = True
+                entities_to_store = []
+                
+                if validation_config.mode == "strict" and has_errors:
+                    # Block all storage if any errors
+                    should_store = False
+                    logger.info(f"│  │")
+                    logger.info(f"│  │  🚫 Storage: BLOCKED (strict mode + errors)")
+                    skipped_entities += result.graph.entity_count
+                
+                elif validation_config.mode == "store_valid":
+                    # Filter to only valid entities
                     for entity_type, entities in result.graph.entities.items():
                         for entity in entities:
-                            entity.metadata["source_chunk_id"] = chunk.id
-                            entity.metadata["source_chunk_index"] = chunk.chunk_index
-                            merged_graph.add_entity(entity)
-                            stored_entities += 1
+                            # Check if this entity has issues
+                            entity_has_issue = False
+                            for err in result.validation_errors:
+                                if entity.display_name in err or entity.id in err:
+                                    entity_has_issue = True
+                                    break
+                            
+                            if not entity_has_issue:
+                                entities_to_store.append((entity_type, entity))
+                            else:
+                                skipped_entities += 1
                     
-                    # Store relationships
-                    for rel in result.graph.relationships:
-                        merged_graph.add_relationship(rel)
-                
-                if validation_config.mode != "ignore":
-                    stored_count = result.graph.entity_count if validation_config.mode != "store_valid" else len(entities_to_store)
-                    if stored_count > 0:
+                    if skipped_entities > 0:
                         logger.info(f"│  │")
-                        logger.info(f"│  │  ✅ Stored: {stored_count} entities, {len(result.graph.relationships)} relationships")
-            
-            # Collect metadata
-            if result.chunk_metadata:
-                result.chunk_metadata.page_number = chunk.metadata.get("page_number")
-                all_chunk_metadata.append(result.chunk_metadata)
-            
-            # Update progress
-            status.chunks_processed = chunk_num
-            status.entities_extracted = merged_graph.entity_count
-            status.relationships_extracted = merged_graph.relationship_count
-            
-            logger.info(f"│  └─ Done")
+                        logger.info(f"│  │  🔶 Storage: {len(entities_to_store)} valid, {result.graph.entity_count - len(entities_to_store)} skipped")
+                
+                elif validation_config.mode == "ignore":
+                    # Silent storage
+                    pass
+                
+                # Default: warn mode - store everything
+                
+                # ───────────────────────────────────────────────────────────
+                # STEP 3c: Actually merge into graph
+                # ───────────────────────────────────────────────────────────
+                if should_store:
+                    if validation_config.mode == "store_valid" and entities_to_store:
+                        # Store only validated entities
+                        chunk_entities = [entity for _, entity in entities_to_store]
+                        chunk_relationships = []
+                    else:
+                        # Store all entities and relationships
+                        chunk_entities = result.graph.get_all_entities()
+                        chunk_relationships = result.graph.relationships
+                        merged_graph.extend_relationships(chunk_relationships)
+                    
+                    added_entities = merged_graph.extend_entities(
+                        chunk_entities, chunk.id, chunk.chunk_index
+                    )
+                    stored_entities += len(chunk_entities)
+                    if entity_sink is not None:
+                        for entity in added_entities:
+                            await entity_sink.put(entity)
+                        # Relationships between entities merged so far can be
+                        # written now; the rest wait for the end of extraction
+                        for rel in chunk_relationships:
+                            if merged_graph.has_entity(rel.source_id) and merged_graph.has_entity(rel.target_id):
+                                await entity_sink.put(rel)
+                    
+                    if validation_config.mode != "ignore":
+                        stored_count = result.graph.entity_count if validation_config.mode != "store_valid" else len(entities_to_store)
+                        if stored_count > 0:
+                            logger.info(f"│  │")
+                            logger.info(f"│  │  ✅ Stored: {stored_count} entities, {len(result.graph.relationships)} relationships")
+                
+                # Collect metadata
+                if result.chunk_metadata:
+                    result.chunk_metadata.page_number = chunk.metadata.get("page_number")
+                    all_chunk_metadata.append(result.chunk_metadata)
+                
+                # Update progress
+                status.entities_extracted = merged_graph.entity_count
+                status.relationships_extracted = merged_graph.relationship_count
+                
+                logger.info(f"│  └─ Done")
+        finally:
+            # Don't leave LLM calls running if merging fails part-way
+            for task in tasks:
+                task.cancel()
         
         # ───────────────────────────────────────────────────────────
         # Summary of validation
@@ -682,6 +922,203 @@ class IngestionPipeline:
         
         return merged_graph, all_chunk_metadata
     
+    async def _extract_streaming(
+        self,
+        chunks: list[TextChunk],
+        source_document: str,
+        status: IngestionStatus,
+    ) -> tuple[DynamicGraph, list[ChunkMetadata]]:
+        """
+        Extract from chunks while writing the graph to Neo4j.
+        
+        Entity nodes, and relationships between already-merged entities,
+        are written by a background task as each chunk is merged,
+        overlapping graph writes with the remaining LLM calls.
+        Relationships that reference entities from later chunks are
+        stored once extraction finishes.
+        
+        If extraction or a write fails, the entities already written for
+        this document are deleted again before the error is raised; if
+        that cleanup fails too, it is recorded in status.cleanup_error.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDING_GRAPH_WRITES)
+        written_entities: list[DynamicEntity] = []
+        writer = asyncio.create_task(self._write_graph_items(queue, written_entities))
+        extraction = asyncio.create_task(self._extract_from_chunks(
+            chunks, source_document, status, entity_sink=queue
+        ))
+        try:
+            # Watch the writer too: a failed write surfaces now instead of
+            # after extraction (which would also block on a full queue)
+            await asyncio.wait({extraction, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if writer.done():
+                # The sentinel isn't queued yet, so the writer stopped on an error
+                writer.result()
+            merged_graph, all_chunk_metadata = extraction.result()
+            
+            await queue.put(None)
+            written_rel_ids = await writer
+            
+            pending = [
+                rel for rel in merged_graph.relationships
+                if rel.id not in written_rel_ids
+            ]
+            if pending:
+                await self.graph_repo.store_relationships(pending)
+        except BaseException:
+            extraction.cancel()
+            writer.cancel()
+            await asyncio.gather(extraction, writer, return_exceptions=True)
+            if written_entities:
+                logger.warning(
+                    f"Removing {len(written_entities)} entities written for "
+                    f"{source_document} before the failure"
+                )
+                try:
+                    await self.graph_repo.delete_entities(written_entities)
+                except Exception as e:
+                    status.cleanup_error = (
+                        f"{len(written_entities)} entities written before the "
+                        f"failure could not be removed: {e}"
+                    )
+                    logger.error(
+                        f"Failed to remove partial graph for {source_document}; "
+                        f"{status.cleanup_error}"
+                    )
+            raise
+        
+        return merged_graph, all_chunk_metadata
+    
+    async def _write_graph_items(
+        self,
+        queue: asyncio.Queue,
+        written_entities: list[DynamicEntity],
+    ) -> set[str]:
+        """
+        Write entities and relationships from the queue until a None sentinel.
+        
+        Args:
+            queue: Entities and relationships to write, then None
+            written_entities: Extended with each entity before it is
+                written, so a failed run knows what to remove
+        
+        Returns:
+            IDs of the relationships that were written
+        """
+        written_rel_ids: set[str] = set()
+        done = False
+        while not done:
+            # Wait for one item, then take whatever else is already queued
+            # so each round-trip writes a batch
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            
+            # Queue order puts a relationship after its endpoint entities,
+            # so writing this batch's entities first keeps that guarantee
+            entities = [item for item in batch if isinstance(item, DynamicEntity)]
+            relationships = [item for item in batch if isinstance(item, DynamicRelationship)]
+            if entities:
+                written_entities.extend(entities)
+                await self.graph_repo.create_entities(entities)
+            if relationships:
+                await self.graph_repo.store_relationships(relationships)
+                written_rel_ids.update(rel.id for rel in relationships)
+        
+        return written_rel_ids
+    
+    def _extraction_cache_scope(self) -> str:
+        """Identify the settings an extraction result depends on."""
+        return "|".join((
+            self.extractor.schema.schema_info.name,
+            self.extractor.llm.model,
+            self.extraction_strategy.model_dump_json(),
+        ))
+    
+    def _extraction_cache_key(self, cache_scope: str, chunk: TextChunk) -> str:
+        """
+        Key a chunk for extraction reuse.
+        
+        With whitespace normalization, chunks that differ only in spacing or
+        line breaks (e.g. the same clause wrapped differently) share a key.
+        With caching disabled every chunk gets a key of its own.
+        """
+        cache_config = self.extraction_strategy.cache
+        if not cache_config.enabled:
+            return f"chunk:{chunk.id}"
+        
+        text = chunk.text
+        if cache_config.normalize_whitespace:
+            text = " ".join(text.split())
+        return hashlib.sha256(f"{cache_scope}\0{text}".encode()).hexdigest()
+    
+    def _cache_extraction(self, key: str, result: ExtractionResult) -> None:
+        """Keep a pristine copy of a successful extraction for reuse."""
+        # Failed calls carry no raw response; don't pin those
+        if not self.extraction_strategy.cache.enabled or result.raw_response is None:
+            return
+        self._extraction_cache[key] = copy.deepcopy(result)
+        self._extraction_cache.move_to_end(key)
+        while len(self._extraction_cache) > self.MAX_CACHED_EXTRACTIONS:
+            self._extraction_cache.popitem(last=False)
+    
+    def _cached_extraction(self, key: str, chunk: TextChunk) -> Optional[ExtractionResult]:
+        """Return a copy of a cached extraction, re-targeted at this chunk."""
+        cached = self._extraction_cache.get(key)
+        if cached is None:
+            return None
+        self._extraction_cache.move_to_end(key)
+        
+        # Merging mutates entities and metadata, so never hand out the original
+        result = copy.deepcopy(cached)
+        if result.chunk_metadata:
+            result.chunk_metadata.chunk_id = chunk.id
+            result.chunk_metadata.chunk_index = chunk.chunk_index
+        return result
+    
+    def _batch_chunks(
+        self, chunks: list[TextChunk], batch_size: int
+    ) -> list[list[TextChunk]]:
+        """
+        Group consecutive chunks into extraction batches.
+        
+        A batch closes at batch_size chunks, or once adding the next chunk
+        would exceed MAX_BATCH_CHARS of chunk text or push the expected
+        response past the extraction client's max_tokens. A truncated
+        response would send every chunk in the batch back through a
+        single-chunk call.
+        """
+        if batch_size <= 1:
+            return [[chunk] for chunk in chunks]
+        
+        max_output_tokens = self.extractor.llm.max_tokens
+        
+        batches: list[list[TextChunk]] = []
+        current: list[TextChunk] = []
+        current_chars = 0
+        current_tokens = 0
+        for chunk in chunks:
+            chunk_tokens = (
+                self.BATCH_METADATA_TOKENS
+                + len(chunk.text) * self.BATCH_OUTPUT_TOKENS_PER_CHAR
+            )
+            if current and (
+                len(current) >= batch_size
+                or current_chars + len(chunk.text) > self.MAX_BATCH_CHARS
+                or current_tokens + chunk_tokens > max_output_tokens
+            ):
+                batches.append(current)
+                current, current_chars, current_tokens = [], 0, 0
+            current.append(chunk)
+            current_chars += len(chunk.text)
+            current_tokens += chunk_tokens
+        if current:
+            batches.append(current)
+        return batches
+    
     def _apply_metadata_to_chunks(
         self,
         chunks: list[TextChunk],
@@ -738,21 +1175,42 @@ class IngestionPipeline:
             link_to_document=strategy.chunk_linking.to_document,
         )
     
-    async def _link_entities_to_chunks(
-        self,
-        graph: DynamicGraph,
-        chunks: list[TextChunk],
-    ) -> None:
+    async def _link_entities_to_chunks(self, graph: DynamicGraph) -> None:
         """Link extracted entities to their source chunks."""
-        # Create lookup
-        chunk_by_id = {c.id: c for c in chunks}
-        
-        for entity_type, entities in graph.entities.items():
-            for entity in entities:
-                # Entity should have source_chunk_id from extraction
-                chunk_id = entity.metadata.get("source_chunk_id")
-                if chunk_id:
-                    await self.graph_repo.link_entity_to_chunk(entity.id, chunk_id)
+        # Entities carry source_chunk_id from extraction
+        links = [
+            (entity_type, entity.id, entity.source_chunk_id)
+            for entity_type, entities in graph.entities.items()
+            for entity in entities
+            if entity.source_chunk_id
+        ]
+        
+        # One bulk write instead of a round-trip per entity
+        if links:
+            await self.graph_repo.link_entities_to_chunks(links)
+    
+    def _track_ingestion(self, status: IngestionStatus) -> None:
+        """
+        Register an ingestion status, evicting the oldest finished ones.
+        
+        Keeps at most MAX_TRACKED_INGESTIONS entries unless more than that
+        are still in flight.
+        """
+        self._active_ingestions[status.document_id] = status
+        self._active_ingestions.move_to_end(status.document_id)
+        
+        excess = len(self._active_ingestions) - self.MAX_TRACKED_INGESTIONS
+        if excess <= 0:
+            return
+        
+        evictable = []
+        for document_id, tracked in self._active_ingestions.items():
+            if tracked.status in self._FINISHED_STATES:
+                evictable.append(document_id)
+                if len(evictable) == excess:
+                    break
+        for document_id in evictable:
+            del self._active_ingestions[document_id]
     
     def get_ingestion_status(self, document_id: str) -> Optional[IngestionStatus]:
         """Get status of an active or completed ingestion."""
@@ -5,15 +5,17 @@ FastAPI application for Knowledge Graph-based RAG system.
 """
 
 import logging
+import re
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
 from app.core.neo4j_client import get_neo4j_client
+from app.core.llm import get_extraction_client
 from app.api.routes import (
     upload_router,
     query_router,
@@ -65,19 +67,16 @@ class ThirdPartyNoiseFilter(logging.Filter):
         "connection_released",
     ]
     
+    # All patterns in one regex so each message is scanned once
+    NOISE_REGEX = re.compile("|".join(map(re.escape, NOISE_PATTERNS)))
+    
     def filter(self, record: logging.LogRecord) -> bool:
         # Always allow warnings, errors, and critical
         if record.levelno >= logging.WARNING:
             return True
         
-        message = record.getMessage()
-        
         # Filter out known noisy patterns at DEBUG/INFO
-        for pattern in self.NOISE_PATTERNS:
-            if pattern in message:
-                return False
-        
-        return True
+        return self.NOISE_REGEX.search(record.getMessage()) is None
 
 
 # Apply smart filter to third-party loggers (instead of blanket level suppression)
@@ -105,6 +104,10 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to connect to Neo4j: {e}")
         logger.warning("Application starting without Neo4j connection")
     
+    # Preload local extraction model (hosted APIs have no cold start)
+    if settings.extraction_warmup and settings.extraction_model.startswith("ollama/"):
+        await get_extraction_client().warmup()
+    
     # Create upload directory
     upload_path = Path(settings.upload_path)
     upload_path.mkdir(exist_ok=True)
@@ -137,6 +140,7 @@ app = FastAPI(
     """,
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
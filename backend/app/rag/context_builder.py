@@ -9,16 +9,41 @@ for the LLM, with support for:
 """
 
 import logging
+from collections import defaultdict
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import Any, Optional
 
+import litellm
+
+from app.config import settings
 from app.strategies import get_strategy_manager, RetrievalStrategy
+from app.strategies.models import IncludeMetadataConfig
 from app.graph.dynamic_repository import DynamicGraphRepository
 
 logger = logging.getLogger(__name__)
 
+# Average characters per token by model family, matched against the model name
+CHARS_PER_TOKEN = {"gpt": 4.0, "claude": 3.5, "llama": 3.7, "gemini": 4.0}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+
+# Entity fields shown first when formatting an entity, in this order
+PRIORITY_FIELDS = ("name", "title", "description", "type", "value", "summary")
+_PRIORITY_SET = frozenset(PRIORITY_FIELDS)
+
+
+def chars_per_token(model: str) -> float:
+    """Get the characters-per-token ratio for a model's family."""
+    # Drop the provider prefix ("ollama/" would otherwise match "llama")
+    name = model.rsplit("/", 1)[-1].lower()
+    for family, ratio in CHARS_PER_TOKEN.items():
+        if family in name:
+            return ratio
+    return DEFAULT_CHARS_PER_TOKEN
+
 
-@dataclass
+@dataclass(slots=True)
 class ContextChunk:
     """A chunk of context with metadata."""
     
@@ -32,7 +57,7 @@ class ContextChunk:
     metadata: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AssembledContext:
     """Assembled context ready for LLM."""
     
@@ -40,6 +65,9 @@ class AssembledContext:
     chunks: list[ContextChunk]
     entities: list[dict[str, Any]]
     
+    # Same entities grouped by type, in first-seen type order
+    entities_by_type: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    
     total_tokens_estimate: int = 0
     truncated: bool = False
     
@@ -72,13 +100,25 @@ class ContextBuilder:
         print(context.text)
     """
     
+    # Estimates above this share of max_context_tokens are re-counted with
+    # the BPE tokenizer, where the char ratio is too coarse to trust
+    EXACT_COUNT_THRESHOLD = 0.8
+    
+    # Share of max_context_tokens the entity section may use; document
+    # excerpts get the rest (plus whatever entities leave unused)
+    MAX_ENTITY_SHARE = 0.3
+    
     def __init__(
         self,
         graph_repo: DynamicGraphRepository,
         retrieval_strategy: Optional[RetrievalStrategy] = None,
+        model: Optional[str] = None,
     ):
         self.graph_repo = graph_repo
         self.strategy = retrieval_strategy or get_strategy_manager().retrieval
+        
+        # Token estimates are sized for the model that will read the context
+        self._chars_per_token = chars_per_token(model or settings.rag_model)
     
     async def build_context(
         self,
@@ -99,6 +139,17 @@ class ContextBuilder:
         """
         context_chunks = []
         
+        # Fetch neighbors of every chunk in one round-trip
+        expand_config = self.strategy.context.expand_neighbors
+        neighbors_by_id = {}
+        if expand_config.enabled:
+            neighbors_by_id = await self.graph_repo.get_neighboring_chunks_batch(
+                chunk_ids=[c["id"] for c in chunks if c.get("id")],
+                before=expand_config.before,
+                after=expand_config.after,
+                within_section=expand_config.mode == "section",
+            )
+        
         # Process chunks with optional expansion
         for chunk_data in chunks:
             chunk_id = chunk_data.get("id")
@@ -117,68 +168,98 @@ class ContextBuilder:
             )
             
             # Expand to neighbors if enabled
-            if self.strategy.context.expand_neighbors.enabled:
-                expanded = await self._expand_chunk_context(chunk_id, base_chunk)
-                context_chunks.extend(expanded)
+            if expand_config.enabled:
+                context_chunks.extend(self._expand_chunk_context(
+                    base_chunk, neighbors_by_id.get(chunk_id, {})
+                ))
             else:
                 context_chunks.append(base_chunk)
         
-        # Deduplicate chunks by ID
-        seen_ids = set()
-        unique_chunks = []
+        # Deduplicate chunks by ID (first occurrence wins)
+        unique_by_id: dict[str, ContextChunk] = {}
         for chunk in context_chunks:
-            if chunk.id not in seen_ids:
-                seen_ids.add(chunk.id)
-                unique_chunks.append(chunk)
+            unique_by_id.setdefault(chunk.id, chunk)
+        unique_chunks = list(unique_by_id.values())
         
-        # Sort by chunk index for coherent reading order
-        unique_chunks.sort(key=lambda c: c.chunk_index)
-        
-        # Limit to max chunks
+        # Keep the most relevant chunks (ties keep retrieval order)
         max_chunks = self.strategy.limits.max_chunks
         if len(unique_chunks) > max_chunks:
+            unique_chunks.sort(key=attrgetter("relevance_score"), reverse=True)
             unique_chunks = unique_chunks[:max_chunks]
         
-        # Build the formatted text
-        formatted_text = self._format_context(
+        # Sort by chunk index for coherent reading order
+        unique_chunks.sort(key=attrgetter("chunk_index"))
+        
+        # Group entities once; the grouping is formatted and returned
+        entities_by_type = self._group_entities(entities)
+        
+        # Build the formatted text, packing chunks into the token budget
+        max_tokens = self.strategy.limits.max_context_tokens
+        formatted_text, packed_chunks, packed_entity_count = self._format_context(
             chunks=unique_chunks,
-            entities=entities,
+            entities_by_type=entities_by_type,
             query=query,
+            max_tokens=max_tokens,
+        )
+        token_estimate = self._count_tokens(formatted_text)
+        truncated = (
+            len(packed_chunks) < len(unique_chunks)
+            or packed_entity_count < sum(map(len, entities_by_type.values()))
+            or token_estimate > max_tokens
         )
-        
-        # Estimate tokens (rough: ~4 chars per token)
-        token_estimate = len(formatted_text) // 4
-        truncated = token_estimate > self.strategy.limits.max_context_tokens
-        
-        if truncated:
-            # Simple truncation - could be smarter
-            max_chars = self.strategy.limits.max_context_tokens * 4
-            formatted_text = formatted_text[:max_chars] + "\n\n[Context truncated due to length]"
         
         return AssembledContext(
             text=formatted_text,
-            chunks=unique_chunks,
+            chunks=packed_chunks,
             entities=entities,
+            entities_by_type=entities_by_type,
             total_tokens_estimate=token_estimate,
             truncated=truncated,
         )
     
-    async def _expand_chunk_context(
+    def _estimate_tokens(self, text: str) -> int:
+        """Estimate tokens in text from the model family's chars-per-token ratio."""
+        return int(len(text) / self._chars_per_token)
+    
+    def _estimate_parts_tokens(self, parts: list[str]) -> int:
+        """Estimate tokens in "\\n".join(parts) without building the string."""
+        return int((sum(map(len, parts)) + len(parts) - 1) / self._chars_per_token)
+    
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count tokens in text, exactly when it is close to the budget.
+        
+        The model family's chars-per-token ratio is O(1) and good enough
+        far from the limit; near it, the text is encoded with LiteLLM's
+        bundled cl100k_base tokenizer (tiktoken, no download needed).
+        """
+        estimate = self._estimate_tokens(text)
+        if estimate < self.strategy.limits.max_context_tokens * self.EXACT_COUNT_THRESHOLD:
+            return estimate
+        return len(litellm.encoding.encode_ordinary(text))
+    
+    def _expand_chunk_context(
         self,
-        chunk_id: str,
         base_chunk: ContextChunk,
+        neighbors: dict[str, Any],
     ) -> list[ContextChunk]:
-        """Expand a chunk to include neighboring chunks."""
-        expand_config = self.strategy.context.expand_neighbors
-        
-        neighbors = await self.graph_repo.get_neighboring_chunks(
-            chunk_id=chunk_id,
-            before=expand_config.before,
-            after=expand_config.after,
-        )
-        
+        """Expand a chunk to include its fetched neighboring chunks."""
         result = []
         
+        # Add the section's opening chunk (section mode), which frames the clause
+        section_head = neighbors.get("section_head")
+        if section_head:
+            result.append(ContextChunk(
+                id=section_head.get("id", ""),
+                text=section_head.get("text", ""),
+                chunk_index=section_head.get("chunk_index", 0),
+                page_number=section_head.get("page_number"),
+                section_heading=section_head.get("section_heading"),
+                source="expanded",
+                relevance_score=0.9,  # Structural context ranks above plain neighbors
+                metadata=section_head,
+            ))
+        
         # Add before chunks
         for chunk_data in neighbors.get("before", []):
             result.append(ContextChunk(
@@ -213,83 +294,175 @@ class ContextBuilder:
     def _format_context(
         self,
         chunks: list[ContextChunk],
-        entities: list[dict[str, Any]],
+        entities_by_type: dict[str, list[dict[str, Any]]],
         query: str,
-    ) -> str:
-        """Format chunks and entities into a context string."""
-        include_config = self.strategy.context.include_metadata
-        parts = []
+        max_tokens: int,
+    ) -> tuple[str, list[ContextChunk], int]:
+        """
+        Format chunks and entities into a context string within max_tokens.
         
-        # Header
-        parts.append(f"# Context for Query: {query}\n")
+        Whole entities are packed into MAX_ENTITY_SHARE of the budget.
+        Chunks are then packed greedily by relevance into the rest: a chunk
+        that would push the context past the budget is skipped, so whole
+        chunks are dropped (least relevant first) rather than the text
+        being cut mid-sentence. Packed chunks are emitted in reading order.
         
-        # Group chunks by section if available
+        Args:
+            chunks: Candidate chunks, in reading order
+            entities_by_type: Entities to include, grouped by type
+            query: Original user query
+            max_tokens: Token budget for the whole context
+            
+        Returns:
+            Tuple of (formatted_text, chunks_included, entities_included)
+        """
+        header = [f"# Context for Query: {query}\n", "\n## Document Excerpts\n"]
+        entity_budget = int(max_tokens * self.MAX_ENTITY_SHARE)
+        entity_parts, entity_count = self._format_entities(entities_by_type, entity_budget)
+        
+        # Chunks share what the header and the (capped) entities leave
+        budget = max_tokens - self._estimate_parts_tokens(header + entity_parts)
+        
+        # Cost each chunk as if it opened a new section and page (an upper bound)
+        include_config = self.strategy.context.include_metadata
+        packed: list[ContextChunk] = []
+        used = 0
+        for chunk in sorted(chunks, key=attrgetter("relevance_score"), reverse=True):
+            cost = self._estimate_parts_tokens(self._format_chunk(chunk, include_config, None, None))
+            if used + cost <= budget:
+                packed.append(chunk)
+                used += cost
+        
+        while True:
+            emitted = sorted(packed, key=attrgetter("chunk_index"))
+            text = "\n".join(header + self._format_chunks(emitted) + entity_parts)
+            if self._count_tokens(text) <= max_tokens:
+                return text, emitted, entity_count
+            # The ratio can undercount; drop the least relevant chunk until
+            # it fits, then shrink the entity section
+            if packed:
+                packed.pop()
+            elif entity_parts:
+                entity_budget = self._estimate_parts_tokens(entity_parts) - 1
+                entity_parts, entity_count = self._format_entities(entities_by_type, entity_budget)
+            else:
+                return text, emitted, entity_count
+    
+    def _format_chunks(self, chunks: list[ContextChunk]) -> list[str]:
+        """Format chunks in order, adding section/page headers when they change."""
+        include_config = self.strategy.context.include_metadata
+        parts = []
         current_section = None
         current_page = None
+        for chunk in chunks:
+            parts.extend(self._format_chunk(chunk, include_config, current_section, current_page))
+            current_section = chunk.section_heading or current_section
+            current_page = chunk.page_number or current_page
+        return parts
+    
+    def _format_chunk(
+        self,
+        chunk: ContextChunk,
+        include_config: IncludeMetadataConfig,
+        current_section: Optional[str],
+        current_page: Optional[int],
+    ) -> list[str]:
+        """Format one chunk, with section/page headers if they differ from the current ones."""
+        parts = []
         
-        parts.append("\n## Document Excerpts\n")
+        # Add section header if changed
+        if include_config.section_heading and chunk.section_heading:
+            if chunk.section_heading != current_section:
+                parts.append(f"\n### {chunk.section_heading}\n")
         
-        for chunk in chunks:
-            # Add section header if changed
-            if include_config.section_heading and chunk.section_heading:
-                if chunk.section_heading != current_section:
-                    current_section = chunk.section_heading
-                    parts.append(f"\n### {current_section}\n")
-            
-            # Add page indicator if changed
-            if include_config.page_number and chunk.page_number:
-                if chunk.page_number != current_page:
-                    current_page = chunk.page_number
-                    parts.append(f"\n[Page {current_page}]\n")
-            
-            # Add chunk text
-            parts.append(f"{chunk.text}\n")
-            
-            # Add temporal refs if included
-            if include_config.temporal_refs:
-                temporal_refs = chunk.metadata.get("temporal_refs")
-                if temporal_refs:
-                    parts.append(f"_Temporal references: {temporal_refs}_\n")
-        
-        # Format entities
-        if entities:
-            parts.append("\n## Extracted Information\n")
-            
-            # Group by type
-            entities_by_type: dict[str, list] = {}
-            for entity in entities:
-                etype = entity.get("_type", entity.get("entity_type", "Entity"))
-                if etype not in entities_by_type:
-                    entities_by_type[etype] = []
-                entities_by_type[etype].append(entity)
-            
-            for etype, type_entities in entities_by_type.items():
-                parts.append(f"\n### {etype}s\n")
-                for entity in type_entities:
-                    parts.append(self._format_entity(entity))
+        # Add page indicator if changed
+        if include_config.page_number and chunk.page_number:
+            if chunk.page_number != current_page:
+                parts.append(f"\n[Page {chunk.page_number}]\n")
+        
+        # Add chunk text
+        parts.append(f"{chunk.text}\n")
+        
+        # Add temporal refs if included
+        if include_config.temporal_refs:
+            temporal_refs = chunk.metadata.get("temporal_refs")
+            if temporal_refs:
+                parts.append(f"_Temporal references: {temporal_refs}_\n")
+        
+        return parts
+    
+    def _group_entities(
+        self, entities: list[dict[str, Any]]
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Group entities by type, keeping first-seen type order."""
+        entities_by_type: dict[str, list] = defaultdict(list)
+        for entity in entities:
+            entities_by_type[entity.get("_type", entity.get("entity_type", "Entity"))].append(entity)
+        return dict(entities_by_type)
+    
+    def _format_entities(
+        self,
+        entities_by_type: dict[str, list[dict[str, Any]]],
+        max_tokens: int,
+    ) -> tuple[list[str], int]:
+        """
+        Format entities grouped by type, packing whole entities into max_tokens.
         
-        return "\n".join(parts)
+        An entity that doesn't fit is skipped; a type heading is only added
+        with its first packed entity.
+        
+        Returns:
+            Tuple of (parts, entities_included); parts is empty if none fit
+        """
+        if not entities_by_type:
+            return [], 0
+        
+        parts = ["\n## Extracted Information\n"]
+        used = self._estimate_parts_tokens(parts)
+        count = 0
+        
+        for etype, type_entities in entities_by_type.items():
+            type_header = f"\n### {etype}s\n"
+            has_header = False
+            for entity in type_entities:
+                entity_parts = [self._format_entity(entity)]
+                if not has_header:
+                    entity_parts.insert(0, type_header)
+                # +1 per part for the joining newline
+                cost = self._estimate_parts_tokens(entity_parts) + 1
+                if used + cost > max_tokens:
+                    continue
+                parts.extend(entity_parts)
+                used += cost
+                count += 1
+                has_header = True
+        
+        if not count:
+            return [], 0
+        return parts, count
     
     def _format_entity(self, entity: dict[str, Any]) -> str:
         """Format an entity as a readable string."""
-        # Priority fields to show first
-        priority = ["name", "title", "description", "type", "value", "summary"]
-        
         # Get entity name/title for header
         name = entity.get("name", entity.get("title", entity.get("id", "Entity")))
         lines = [f"**{name}**"]
         
-        # Add priority fields first
-        for field in priority:
-            if field in entity and entity[field]:
-                lines.append(f"  - {field}: {entity[field]}")
-        
-        # Add other fields (excluding internal ones)
+        # Split fields in one pass: priority fields are shown first (in
+        # PRIORITY_FIELDS order), then the rest minus internal/complex ones
+        priority_values = {}
+        other_lines = []
         for key, value in entity.items():
-            if key not in priority and not key.startswith("_") and value:
-                if isinstance(value, (list, dict)):
-                    continue  # Skip complex values
-                lines.append(f"  - {key}: {value}")
+            if not value:
+                continue
+            if key in _PRIORITY_SET:
+                priority_values[key] = value
+            elif not key.startswith("_") and not isinstance(value, (list, dict)):
+                other_lines.append(f"  - {key}: {value}")
+        
+        for field in PRIORITY_FIELDS:
+            if field in priority_values:
+                lines.append(f"  - {field}: {priority_values[field]}")
+        lines.extend(other_lines)
         
         return "\n".join(lines) + "\n"
     
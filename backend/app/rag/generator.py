@@ -4,9 +4,12 @@ Response generation for RAG.
 Generates natural language responses using retrieved context.
 """
 
+import asyncio
 import logging
-from typing import Optional
+import re
+from typing import Any, AsyncIterator, Literal, Optional
 
+from app.config import settings
 from app.core.llm import LLMClient, get_rag_client
 from app.rag.retriever import RetrievalContext
 
@@ -44,6 +47,13 @@ RAG_USER_PROMPT = """## Context from Knowledge Graph
 Based on the context above, provide a comprehensive answer to the user's question. If the context doesn't contain sufficient information, explain what's missing and suggest what additional information might be needed."""
 
 
+FOLLOW_UPS_MARKER = "## Follow-up Questions"
+
+FOLLOW_UPS_INSTRUCTION = """
+
+After your answer, add a line containing exactly "{marker}" followed by 3 relevant follow-up questions that would help the user understand the document better, one per line."""
+
+
 SUMMARIZATION_PROMPT = """Summarize the following document information concisely:
 
 {context}
@@ -55,6 +65,17 @@ Provide:
 4. Notable sections or findings"""
 
 
+COMPARISON_SUMMARY_PROMPT = """Summarize the following document information as input to a comparison:
+
+{context}
+
+## Comparison Request
+
+{question}
+
+Keep only the facts relevant to the comparison request: entities, terms, dates, amounts and obligations, quoting exact wording where it matters."""
+
+
 class ResponseGenerator:
     """
     Generates natural language responses using LLM and retrieved context.
@@ -73,6 +94,19 @@ class ResponseGenerator:
         )
     """
     
+    # Phrases marking a response as uncertain (lowers confidence)
+    UNCERTAINTY_PHRASES = [
+        "i don't know",
+        "not sure",
+        "unclear",
+        "cannot determine",
+        "insufficient",
+        "no information",
+    ]
+    
+    # All phrases in one case-insensitive regex so a response is scanned once
+    UNCERTAINTY_REGEX = re.compile("|".join(map(re.escape, UNCERTAINTY_PHRASES)), re.IGNORECASE)
+    
     def __init__(
         self,
         llm_client: Optional[LLMClient] = None,
@@ -86,20 +120,32 @@ class ResponseGenerator:
         question: str,
         context: RetrievalContext,
         include_sources: bool = True,
+        include_follow_ups: bool = False,
+        history: Optional[list[dict[str, str]]] = None,
+        extra_context: Optional[str] = None,
     ) -> dict:
         """
         Generate a response to a question using retrieved context.
         
+        With include_follow_ups the answer and its follow-up questions come
+        from the same LLM call: the model appends them after FOLLOW_UPS_MARKER
+        and they are split off into the "follow_ups" key.
+        
         Args:
             question: User's question
             context: Retrieved context from knowledge graph
             include_sources: Whether to include source references
+            include_follow_ups: Ask for follow-up questions in the same call
+            history: Earlier conversation turns as chat messages; kept out
+                of the system prompt so it stays identical across calls
+            extra_context: User-provided text appended to the retrieved
+                context under an "Additional Context" heading
             
         Returns:
             Dict with response, sources, and metadata
         """
         # Check if we have context
-        if context.is_empty:
+        if context.is_empty and not extra_context:
             return {
                 "response": "I couldn't find relevant information in the knowledge graph to answer your question. Please try rephrasing your question or ensure the relevant documents have been processed.",
                 "sources": [],
@@ -108,17 +154,28 @@ class ResponseGenerator:
             }
         
         # Build prompt
+        prompt_context = context.raw_text
+        if extra_context:
+            prompt_context = "".join((prompt_context, "\n\n## Additional Context\n", extra_context))
         prompt = RAG_USER_PROMPT.format(
-            context=context.raw_text,
+            context=prompt_context,
             question=question,
         )
+        if include_follow_ups:
+            prompt += FOLLOW_UPS_INSTRUCTION.format(marker=FOLLOW_UPS_MARKER)
         
         try:
-            response = await self.llm.complete(
+            response = await self._complete_with_timeout(
+                settings.rag_generation_timeout,
                 prompt=prompt,
                 system_prompt=self.system_prompt,
+                history=history,
             )
             
+            follow_ups = None
+            if include_follow_ups:
+                response, follow_ups = self._split_follow_ups(response)
+            
             # Extract sources if requested
             sources = []
             if include_sources:
@@ -127,13 +184,16 @@ class ResponseGenerator:
             # Estimate confidence based on context quality
             confidence = self._estimate_confidence(context, response)
             
-            return {
+            result = {
                 "response": response,
                 "sources": sources,
                 "confidence": confidence,
                 "has_context": True,
                 "entity_count": context.entity_count,
             }
+            if follow_ups is not None:
+                result["follow_ups"] = follow_ups
+            return result
             
         except Exception as e:
             logger.error(f"Response generation failed: {e}")
@@ -145,6 +205,111 @@ class ResponseGenerator:
                 "error": str(e),
             }
     
+    async def generate_with_followups(
+        self,
+        question: str,
+        context: RetrievalContext,
+        include_sources: bool = True,
+    ) -> dict:
+        """
+        Generate a response and start follow-up generation in the background.
+        
+        Returns as soon as the main response is ready. Follow-up questions
+        depend on the response text, so they are generated afterwards in a
+        task that overlaps with whatever the caller does next (rendering
+        the answer, the user reading it).
+        
+        Args:
+            question: User's question
+            context: Retrieved context from knowledge graph
+            include_sources: Whether to include source references
+            
+        Returns:
+            Dict from generate(), plus "followups_task": an asyncio.Task
+            resolving to the follow-up questions ([] on failure), or None
+            when there was no context to answer from
+        """
+        result = await self.generate(question, context, include_sources)
+        
+        result["followups_task"] = None
+        if result.get("has_context") and "error" not in result:
+            result["followups_task"] = asyncio.create_task(
+                self._safe_follow_up_questions(question, result["response"], context)
+            )
+        return result
+    
+    async def _safe_follow_up_questions(
+        self,
+        question: str,
+        response: str,
+        context: RetrievalContext,
+    ) -> list[str]:
+        """Generate follow-up questions, returning [] instead of raising."""
+        try:
+            return await self.generate_follow_up_questions(question, response, context)
+        except Exception as e:
+            logger.warning(f"Follow-up generation failed: {e}")
+            return []
+    
+    async def generate_stream(
+        self,
+        question: str,
+        context: RetrievalContext,
+        include_sources: bool = True,
+        history: Optional[list[dict[str, str]]] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Generate a response as a stream of events.
+        
+        Streaming variant of generate(): the first tokens reach the caller
+        as soon as the model emits them instead of after the full response.
+        
+        Args:
+            question: User's question
+            context: Retrieved context from knowledge graph
+            include_sources: Whether to include source references
+            history: Earlier conversation turns as chat messages
+            
+        Yields:
+            {"type": "token", "data": str} for each response fragment, then
+            {"type": "done", "data": {...}} with sources and confidence
+            ({"type": "error", "data": str} if generation fails)
+        """
+        if context.is_empty:
+            result = await self.generate(question, context, include_sources)
+            yield {"type": "token", "data": result["response"]}
+            yield {"type": "done", "data": {k: v for k, v in result.items() if k != "response"}}
+            return
+        
+        prompt = RAG_USER_PROMPT.format(
+            context=context.raw_text,
+            question=question,
+        )
+        
+        fragments = []
+        try:
+            async for fragment in self.llm.stream(
+                prompt=prompt,
+                system_prompt=self.system_prompt,
+                history=history,
+            ):
+                fragments.append(fragment)
+                yield {"type": "token", "data": fragment}
+        except Exception as e:
+            logger.error(f"Response streaming failed: {e}")
+            yield {"type": "error", "data": str(e)}
+            return
+        
+        yield {
+            "type": "done",
+            "data": {
+                "sources": self._extract_sources(context) if include_sources else [],
+                "confidence": self._estimate_confidence(context, "".join(fragments)),
+                "has_context": True,
+                "entity_count": context.entity_count,
+            },
+        }
+    
     async def generate_summary(
         self,
         context: RetrievalContext,
@@ -165,11 +330,24 @@ class ResponseGenerator:
         question: str,
         contexts: list[RetrievalContext],
         labels: list[str],
+        strategy: Literal["fused", "map_reduce"] = "map_reduce",
     ) -> dict:
         """
         Generate a comparison between multiple contexts.
         
         Useful for comparing entities or sections across documents.
+        
+        Args:
+            question: What to compare
+            contexts: One retrieved context per compared item
+            labels: Display label for each context
+            strategy: "fused" sends every raw context in a single prompt;
+                "map_reduce" first summarizes each context concurrently
+                for the question, then compares the short summaries (stays
+                within the context window for long documents)
+            
+        Returns:
+            Dict with the comparison response and what was compared
         """
         if not contexts:
             return {
@@ -177,10 +355,25 @@ class ResponseGenerator:
                 "confidence": 0.0,
             }
         
+        if strategy == "map_reduce":
+            # One summary call per context, run concurrently
+            sections = await asyncio.gather(*[
+                self.llm.complete(
+                    prompt=COMPARISON_SUMMARY_PROMPT.format(
+                        context=ctx.raw_text,
+                        question=question,
+                    ),
+                    system_prompt=self.system_prompt,
+                )
+                for ctx in contexts
+            ])
+        else:
+            sections = [ctx.raw_text for ctx in contexts]
+        
         # Build comparison context
         comparison_parts = []
-        for label, ctx in zip(labels, contexts):
-            comparison_parts.append(f"## {label}\n{ctx.raw_text}")
+        for label, section in zip(labels, sections):
+            comparison_parts.append(f"## {label}\n{section}")
         
         combined_context = "\n\n---\n\n".join(comparison_parts)
         
@@ -249,20 +442,8 @@ Provide a structured comparison highlighting:
         confidence += entity_factor
         
         # Check if response indicates uncertainty
-        uncertainty_phrases = [
-            "i don't know",
-            "not sure",
-            "unclear",
-            "cannot determine",
-            "insufficient",
-            "no information",
-        ]
-        
-        response_lower = response.lower()
-        for phrase in uncertainty_phrases:
-            if phrase in response_lower:
-                confidence -= 0.2
-                break
+        if self.UNCERTAINTY_REGEX.search(response):
+            confidence -= 0.2
         
         # Check if response is substantive
         if len(response) > 200:
@@ -286,16 +467,62 @@ Answer: {response}
 Generate 3 relevant follow-up questions that would help the user understand the document better. 
 Return only the questions, one per line."""
         
-        result = await self.llm.complete(
+        result = await self._complete_with_timeout(
+            settings.rag_follow_up_timeout,
             prompt=prompt,
             system_prompt="You are a helpful assistant generating follow-up questions.",
             max_tokens=200,
         )
         
-        # Parse questions from response
+        return self._parse_questions(result)
+    
+    async def _complete_with_timeout(self, timeout: float, **kwargs: Any) -> str:
+        """
+        Run an LLM completion, abandoning and retrying attempts that stall.
+        
+        Provider latency has a long tail; a fresh request usually finishes
+        sooner than waiting out a stuck one.
+        
+        Args:
+            timeout: Seconds per attempt (0 waits indefinitely)
+            **kwargs: Arguments for LLMClient.complete
+            
+        Returns:
+            Generated text response
+        """
+        if timeout <= 0:
+            return await self.llm.complete(**kwargs)
+        
+        attempts = 1 + max(settings.rag_generation_retries, 0)
+        for attempt in range(1, attempts + 1):
+            try:
+                return await asyncio.wait_for(self.llm.complete(**kwargs), timeout)
+            except TimeoutError:
+                logger.warning(f"LLM call timed out after {timeout:.0f}s (attempt {attempt}/{attempts})")
+        raise TimeoutError(f"LLM call timed out after {attempts} attempts of {timeout:.0f}s")
+    
+    def _split_follow_ups(self, response: str) -> tuple[str, list[str]]:
+        """
+        Split an answer generated with FOLLOW_UPS_INSTRUCTION.
+        
+        Args:
+            response: Raw LLM output
+            
+        Returns:
+            Tuple of (answer, follow-up questions); the whole output is the
+            answer when the model left out the marker
+        """
+        answer, marker, questions = response.rpartition(FOLLOW_UPS_MARKER)
+        if not marker:
+            return response, []
+        return answer.rstrip(), self._parse_questions(questions)
+    
+    @staticmethod
+    def _parse_questions(text: str) -> list[str]:
+        """Parse up to 3 questions from one-per-line LLM output."""
         questions = [
-            q.strip().lstrip("0123456789.-) ")
-            for q in result.strip().split("\n")
+            q.strip().lstrip("0123456789.-*) ")
+            for q in text.strip().split("\n")
             if q.strip()
         ]
         
@@ -5,10 +5,15 @@ Combines retrieval and generation into a complete
 question-answering pipeline.
 """
 
+import asyncio
+import hashlib
 import logging
-from dataclasses import dataclass
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import Any, Optional
+from itertools import islice
+from typing import Any, AsyncIterator, Optional
 
 from app.config import settings
 from app.rag.retriever import GraphRetriever, RetrievalContext
@@ -16,8 +21,11 @@ from app.rag.generator import ResponseGenerator
 
 logger = logging.getLogger(__name__)
 
+# Rule framing the per-query log banner
+BANNER_RULE = "═" * 60
 
-@dataclass
+
+@dataclass(slots=True)
 class RAGResponse:
     """Complete RAG response with all metadata."""
     
@@ -56,13 +64,13 @@ class RAGResponse:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """A single turn in a conversation."""
     
     question: str
     answer: str
-    timestamp: datetime
+    timestamp: float  # Unix time; rendered as ISO 8601 by get_history()
     sources: list[dict]
 
 
@@ -82,6 +90,13 @@ class RAGPipeline:
         print(response.answer)
     """
     
+    # Answers kept for repeated questions (LRU, expiring after rag_answer_cache_ttl)
+    MAX_CACHED_ANSWERS = 256
+    
+    # Retrieved contexts kept for repeated queries (LRU, expiring after
+    # rag_retrieval_cache_ttl)
+    MAX_CACHED_RETRIEVALS = 128
+    
     def __init__(
         self,
         retriever: Optional[GraphRetriever] = None,
@@ -91,8 +106,19 @@ class RAGPipeline:
         self.generator = generator or ResponseGenerator()
         
         # Conversation history for context
-        self._conversation_history: list[ConversationTurn] = []
         self._max_history = settings.rag_max_conversation_history
+        self._conversation_history: deque[ConversationTurn] = deque(maxlen=self._max_history)
+        
+        # Answer cache: key -> (expiry on the monotonic clock, response)
+        self._answer_cache: OrderedDict[str, tuple[float, RAGResponse]] = OrderedDict()
+        
+        # Queries being answered right now, by answer cache key
+        self._inflight_answers: dict[str, asyncio.Future] = {}
+        
+        # Retrieval cache: key -> (expiry, document_id, context)
+        self._retrieval_cache: OrderedDict[
+            str, tuple[float, Optional[str], RetrievalContext]
+        ] = OrderedDict()
     
     async def query(
         self,
@@ -100,6 +126,9 @@ class RAGPipeline:
         document_id: Optional[str] = None,
         include_follow_ups: bool = True,
         use_conversation_history: bool = True,
+        expensive_follow_ups: bool = False,
+        include_debug: bool = True,
+        include_context_preview: bool = False,
     ) -> RAGResponse:
         """
         Process a question through the RAG pipeline.
@@ -109,20 +138,27 @@ class RAGPipeline:
             document_id: Optional document to focus on
             include_follow_ups: Generate follow-up questions
             use_conversation_history: Consider conversation context
+            expensive_follow_ups: Generate follow-ups with a second LLM call
+                instead of alongside the answer
+            include_debug: Attach Cypher queries and raw retrieval results
+            include_context_preview: Attach the first 500 characters of the
+                retrieved context
             
         Returns:
             RAGResponse with answer and metadata
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # ═══════════════════════════════════════════════════════════════
         # QUERY/RAG FLOW
         # ═══════════════════════════════════════════════════════════════
-        logger.info("")
-        logger.info("═" * 60)
-        logger.info(f"🔍 QUERY: {question[:60]}{'...' if len(question) > 60 else ''}")
-        logger.info("═" * 60)
+        # The step-by-step log formats strings; skip it all when INFO is off
+        log_steps = logger.isEnabledFor(logging.INFO)
+        if log_steps:
+            logger.info("")
+            logger.info(BANNER_RULE)
+            logger.info(f"🔍 QUERY: {question[:60]}{'...' if len(question) > 60 else ''}")
+            logger.info(BANNER_RULE)
         
         # ─────────────────────────────────────────────────────────────
         # STEP 1: Prepare query
@@ -130,57 +166,130 @@ class RAGPipeline:
         logger.info("")
         logger.info("┌─ STEP 1: Prepare query")
         
-        # Augment question with conversation history if enabled
+        # Augment question with conversation history if enabled: the
+        # augmented text drives retrieval, while generation gets the turns
+        # as separate chat messages
         if use_conversation_history and self._conversation_history:
             augmented_question = self._augment_with_history(question)
-            logger.info(f"│  History: {len(self._conversation_history)} previous turns included")
+            history_messages = self._history_messages()
+            if log_steps:
+                logger.info(f"│  History: {len(self._conversation_history)} previous turns included")
         else:
             augmented_question = question
+            history_messages = None
             logger.info("│  History: None (fresh query)")
         
+        cache_key = self._answer_cache_key(
+            augmented_question,
+            document_id,
+            include_follow_ups,
+            include_debug,
+            include_context_preview,
+        )
+        cached = self._cached_answer(cache_key)
+        if cached is not None:
+            logger.info("└─ ✓ Answer cache hit")
+            return self._reuse_answer(cached, question, start_time)
+        
+        # An identical question already being answered shares its answer
+        inflight = self._inflight_answers.get(cache_key)
+        while inflight is not None:
+            logger.info("│  Waiting for identical in-flight query")
+            shared = await asyncio.shield(inflight)
+            if shared is not None:
+                logger.info("└─ ✓ Shared in-flight answer")
+                return self._reuse_answer(shared, question, start_time)
+            inflight = self._inflight_answers.get(cache_key)
+        
         logger.info("└─ ✓ Query prepared")
         
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_answers[cache_key] = future
+        response = None
+        try:
+            response = await self._run_query(
+                question=question,
+                augmented_question=augmented_question,
+                document_id=document_id,
+                include_follow_ups=include_follow_ups,
+                expensive_follow_ups=expensive_follow_ups,
+                include_debug=include_debug,
+                include_context_preview=include_context_preview,
+                history_messages=history_messages,
+                cache_key=cache_key,
+                start_time=start_time,
+                log_steps=log_steps,
+            )
+            return response
+        finally:
+            # On failure the first waiter retries and the others wait for it
+            if self._inflight_answers.get(cache_key) is future:
+                del self._inflight_answers[cache_key]
+            future.set_result(response)
+    
+    async def _run_query(
+        self,
+        question: str,
+        augmented_question: str,
+        document_id: Optional[str],
+        include_follow_ups: bool,
+        expensive_follow_ups: bool,
+        include_debug: bool,
+        include_context_preview: bool,
+        history_messages: Optional[list[dict[str, str]]],
+        cache_key: str,
+        start_time: float,
+        log_steps: bool,
+    ) -> RAGResponse:
+        """Run retrieval and generation for a prepared query (steps 2-4)."""
         # ─────────────────────────────────────────────────────────────
         # STEP 2: Multi-signal retrieval
         # ─────────────────────────────────────────────────────────────
         logger.info("")
         logger.info("┌─ STEP 2: Multi-signal retrieval")
         
-        retrieval_start = time.time()
-        context = await self.retriever.retrieve(
+        retrieval_start = time.perf_counter()
+        context = await self._retrieve(
             query=augmented_question,
             document_id=document_id,
         )
-        retrieval_time = (time.time() - retrieval_start) * 1000
+        retrieval_time = (time.perf_counter() - retrieval_start) * 1000
         
-        logger.info(f"│  Methods used: {', '.join(context.search_methods_used) if context.search_methods_used else 'default'}")
-        logger.info(f"│  Entities: {context.entity_count} | Chunks: {context.chunk_count}")
-        logger.info(f"└─ ✓ Retrieval complete ({retrieval_time:.0f}ms)")
+        if log_steps:
+            logger.info(f"│  Methods used: {', '.join(context.search_methods_used) if context.search_methods_used else 'default'}")
+            logger.info(f"│  Entities: {context.entity_count} | Chunks: {context.chunk_count}")
+            logger.info(f"└─ ✓ Retrieval complete ({retrieval_time:.0f}ms)")
         
         # ─────────────────────────────────────────────────────────────
         # STEP 3: Generate response (LLM)
         # ─────────────────────────────────────────────────────────────
         logger.info("")
         logger.info("┌─ STEP 3: Generate response (LLM)")
-        logger.info(f"│  Context size: {len(context.raw_text)} chars")
+        if log_steps:
+            logger.info(f"│  Context size: {len(context.raw_text)} chars")
         
-        generation_start = time.time()
+        generation_start = time.perf_counter()
         generation_result = await self.generator.generate(
             question=question,
             context=context,
             include_sources=True,
+            include_follow_ups=include_follow_ups and not expensive_follow_ups,
+            history=history_messages,
         )
-        generation_time = (time.time() - generation_start) * 1000
+        generation_time = (time.perf_counter() - generation_start) * 1000
         
-        confidence = generation_result.get("confidence", 0)
-        logger.info(f"│  Confidence: {confidence:.0%}")
-        logger.info(f"└─ ✓ Generation complete ({generation_time:.0f}ms)")
+        if log_steps:
+            confidence = generation_result.get("confidence", 0)
+            logger.info(f"│  Confidence: {confidence:.0%}")
+            if "follow_ups" in generation_result:
+                logger.info(f"│  Follow-ups: {len(generation_result['follow_ups'])} (same call)")
+            logger.info(f"└─ ✓ Generation complete ({generation_time:.0f}ms)")
         
         # ─────────────────────────────────────────────────────────────
-        # STEP 4: Generate follow-ups (optional)
+        # STEP 4: Generate follow-ups (optional, separate LLM call)
         # ─────────────────────────────────────────────────────────────
-        follow_ups = None
-        if include_follow_ups and generation_result.get("has_context"):
+        follow_ups = generation_result.get("follow_ups")
+        if include_follow_ups and expensive_follow_ups and generation_result.get("has_context"):
             logger.info("")
             logger.info("┌─ STEP 4: Generate follow-up questions")
             try:
@@ -199,15 +308,16 @@ class RAGPipeline:
         # ─────────────────────────────────────────────────────────────
         # COMPLETE
         # ─────────────────────────────────────────────────────────────
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter() - start_time) * 1000
         
-        logger.info("")
-        logger.info("═" * 60)
-        logger.info(f"✅ QUERY COMPLETE")
-        logger.info(f"   Answer length: {len(generation_result['response'])} chars")
-        logger.info(f"   Sources: {len(generation_result.get('sources', []))} | Time: {total_time:.0f}ms")
-        logger.info("═" * 60)
-        logger.info("")
+        if log_steps:
+            logger.info("")
+            logger.info(BANNER_RULE)
+            logger.info("✅ QUERY COMPLETE")
+            logger.info(f"   Answer length: {len(generation_result['response'])} chars")
+            logger.info(f"   Sources: {len(generation_result.get('sources', []))} | Time: {total_time:.0f}ms")
+            logger.info(BANNER_RULE)
+            logger.info("")
         
         # Store in conversation history
         self._add_to_history(
@@ -216,7 +326,7 @@ class RAGPipeline:
             sources=generation_result.get("sources", []),
         )
         
-        return RAGResponse(
+        response = RAGResponse(
             question=question,
             answer=generation_result["response"],
             sources=generation_result.get("sources", []),
@@ -226,9 +336,125 @@ class RAGPipeline:
             total_time_ms=total_time,
             entities_retrieved=context.entity_count,
             follow_up_questions=follow_ups,
-            context_preview=context.raw_text[:500] if context.raw_text else None,
+            context_preview=context.raw_text[:500] if include_context_preview and context.raw_text else None,
+            debug_info=context.to_debug_dict() if include_debug else None,
+        )
+        
+        # Only grounded, successful answers are worth repeating
+        if generation_result.get("has_context") and "error" not in generation_result:
+            self._cache_answer(cache_key, response)
+        
+        return response
+    
+    async def query_stream(
+        self,
+        question: str,
+        document_id: Optional[str] = None,
+        include_follow_ups: bool = True,
+        use_conversation_history: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Process a question, streaming the answer as it is generated.
+        
+        Streaming variant of query(): retrieval runs first, then answer
+        tokens are forwarded as the model emits them. Follow-up questions
+        are generated after the answer has been streamed.
+        
+        Args:
+            question: User's question
+            document_id: Optional document to focus on
+            include_follow_ups: Generate follow-up questions
+            use_conversation_history: Consider conversation context
+            
+        Yields:
+            {"type": "token", "data": str} for each answer fragment, then
+            {"type": "done", "data": RAGResponse.to_dict()}
+            ({"type": "error", "data": str} if generation fails)
+        """
+        start_time = time.perf_counter()
+        logger.info(f"🔍 STREAMED QUERY: {question[:60]}{'...' if len(question) > 60 else ''}")
+        
+        if use_conversation_history and self._conversation_history:
+            augmented_question = self._augment_with_history(question)
+            history_messages = self._history_messages()
+        else:
+            augmented_question = question
+            history_messages = None
+        
+        cache_key = self._answer_cache_key(
+            augmented_question,
+            document_id,
+            include_follow_ups,
+            True,
+            False,
+        )
+        cached = self._cached_answer(cache_key)
+        if cached is not None:
+            response = self._reuse_answer(cached, question, start_time)
+            yield {"type": "token", "data": response.answer}
+            yield {"type": "done", "data": response.to_dict()}
+            return
+        
+        retrieval_start = time.perf_counter()
+        context = await self._retrieve(augmented_question, document_id)
+        retrieval_time = (time.perf_counter() - retrieval_start) * 1000
+        
+        generation_start = time.perf_counter()
+        fragments = []
+        result = None
+        async for event in self.generator.generate_stream(
+            question=question,
+            context=context,
+            include_sources=True,
+            history=history_messages,
+        ):
+            if event["type"] == "token":
+                fragments.append(event["data"])
+            elif event["type"] == "done":
+                result = event["data"]
+                continue
+            yield event
+        generation_time = (time.perf_counter() - generation_start) * 1000
+        
+        if result is None:
+            return
+        answer = "".join(fragments)
+        
+        follow_ups = None
+        if include_follow_ups and result.get("has_context"):
+            try:
+                follow_ups = await self.generator.generate_follow_up_questions(
+                    question=question,
+                    response=answer,
+                    context=context,
+                )
+            except Exception as e:
+                logger.warning(f"Follow-up generation failed: {e}")
+                follow_ups = []
+        
+        self._add_to_history(
+            question=question,
+            answer=answer,
+            sources=result.get("sources", []),
+        )
+        
+        response = RAGResponse(
+            question=question,
+            answer=answer,
+            sources=result.get("sources", []),
+            confidence=result.get("confidence", 0.5),
+            retrieval_time_ms=retrieval_time,
+            generation_time_ms=generation_time,
+            total_time_ms=(time.perf_counter() - start_time) * 1000,
+            entities_retrieved=context.entity_count,
+            follow_up_questions=follow_ups,
             debug_info=context.to_debug_dict(),
         )
+        if result.get("has_context") and "error" not in result:
+            self._cache_answer(cache_key, response)
+        
+        logger.info(f"✅ STREAMED QUERY COMPLETE ({response.total_time_ms:.0f}ms)")
+        yield {"type": "done", "data": response.to_dict()}
     
     async def query_with_context(
         self,
@@ -241,35 +467,26 @@ class RAGPipeline:
         
         Useful when user wants to provide extra information.
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Retrieve from graph
-        retrieval_start = time.time()
-        graph_context = await self.retriever.retrieve(
+        retrieval_start = time.perf_counter()
+        graph_context = await self._retrieve(
             query=question,
             document_id=document_id,
         )
-        retrieval_time = (time.time() - retrieval_start) * 1000
+        retrieval_time = (time.perf_counter() - retrieval_start) * 1000
         
-        # Augment context with user-provided info
-        augmented_raw_text = f"{graph_context.raw_text}\n\n## Additional Context\n{additional_context}"
-        
-        augmented_context = RetrievalContext(
-            entities=graph_context.entities,
-            relationships=graph_context.relationships,
-            raw_text=augmented_raw_text,
-        )
-        
-        # Generate response
-        generation_start = time.time()
+        # Generate response, with the user-provided info added to the prompt
+        generation_start = time.perf_counter()
         generation_result = await self.generator.generate(
             question=question,
-            context=augmented_context,
+            context=graph_context,
+            extra_context=additional_context,
         )
-        generation_time = (time.time() - generation_start) * 1000
+        generation_time = (time.perf_counter() - generation_start) * 1000
         
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter() - start_time) * 1000
         
         return RAGResponse(
             question=question,
@@ -286,7 +503,7 @@ class RAGPipeline:
         self, document_id: str
     ) -> dict[str, Any]:
         """Generate a summary of a specific document."""
-        context = await self.retriever.retrieve(
+        context = await self._retrieve(
             query="Provide a complete summary of this document",
             document_id=document_id,
         )
@@ -311,16 +528,17 @@ class RAGPipeline:
         aspect: str = "general",
     ) -> dict[str, Any]:
         """Compare multiple documents."""
-        contexts = []
-        labels = []
-        
-        for doc_id in document_ids:
-            ctx = await self.retriever.retrieve(
+        # Retrieve every document's context concurrently
+        contexts = await asyncio.gather(*[
+            self._retrieve(
                 query=f"Get information about {aspect}",
                 document_id=doc_id,
             )
-            contexts.append(ctx)
-            
+            for doc_id in document_ids
+        ])
+        
+        labels = []
+        for doc_id, ctx in zip(document_ids, contexts):
             # Get document title for label
             for entity in ctx.entities:
                 if entity.get("title") or entity.get("name"):
@@ -331,7 +549,7 @@ class RAGPipeline:
         
         comparison = await self.generator.generate_comparison(
             question=f"Compare these documents focusing on {aspect}",
-            contexts=contexts,
+            contexts=list(contexts),
             labels=labels,
         )
         
@@ -347,15 +565,25 @@ class RAGPipeline:
             return question
         
         # Include last few exchanges
-        history_context = []
-        for turn in self._conversation_history[-3:]:
-            history_context.append(f"Q: {turn.question}")
-            history_context.append(f"A: {turn.answer[:200]}...")
+        history_context = "\n".join(
+            f"Q: {turn.question}\nA: {turn.answer[:200]}..."
+            for turn in self._recent_turns()
+        )
         
-        return f"""Previous conversation:
-{chr(10).join(history_context)}
-
-Current question: {question}"""
+        return f"Previous conversation:\n{history_context}\n\nCurrent question: {question}"
+    
+    def _recent_turns(self) -> list[ConversationTurn]:
+        """Return the last few exchanges used as conversation context."""
+        recent_start = max(len(self._conversation_history) - 3, 0)
+        return list(islice(self._conversation_history, recent_start, None))
+    
+    def _history_messages(self) -> list[dict[str, str]]:
+        """Return the last few exchanges as alternating chat messages."""
+        messages = []
+        for turn in self._recent_turns():
+            messages.append({"role": "user", "content": turn.question})
+            messages.append({"role": "assistant", "content": turn.answer})
+        return messages
     
     def _add_to_history(
         self,
@@ -367,19 +595,137 @@ Current question: {question}"""
         turn = ConversationTurn(
             question=question,
             answer=answer,
-            timestamp=datetime.now(),
+            timestamp=time.time(),
             sources=sources,
         )
         
+        # The deque's maxlen drops the oldest turn
         self._conversation_history.append(turn)
+    
+    def _answer_cache_key(
+        self,
+        question: str,
+        document_id: Optional[str],
+        include_follow_ups: bool,
+        include_debug: bool,
+        include_context_preview: bool,
+    ) -> str:
+        """
+        Key a query for answer reuse.
+        
+        Questions that differ only in case or spacing share a key. The
+        question passed in already carries any conversation history, so
+        follow-up questions in a conversation only match the same exchange.
+        """
+        normalized = " ".join(question.casefold().split())
+        scope = "|".join((
+            self.generator.llm.model,
+            document_id or "",
+            "follow_ups" if include_follow_ups else "",
+            "debug" if include_debug else "",
+            "context_preview" if include_context_preview else "",
+        ))
+        return hashlib.sha256(f"{scope}\0{normalized}".encode()).hexdigest()
+    
+    def _cache_answer(self, key: str, response: RAGResponse) -> None:
+        """Keep a response for reuse until it expires."""
+        ttl = settings.rag_answer_cache_ttl
+        if ttl <= 0:
+            return
+        self._answer_cache[key] = (time.monotonic() + ttl, response)
+        self._answer_cache.move_to_end(key)
+        while len(self._answer_cache) > self.MAX_CACHED_ANSWERS:
+            self._answer_cache.popitem(last=False)
+    
+    def _cached_answer(self, key: str) -> Optional[RAGResponse]:
+        """Return a cached response that has not expired yet."""
+        entry = self._answer_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._answer_cache[key]
+            return None
+        self._answer_cache.move_to_end(key)
+        return response
+    
+    async def _retrieve(self, query: str, document_id: Optional[str]) -> RetrievalContext:
+        """
+        Retrieve context, reusing a recent result for the same query.
         
-        # Trim history if too long
-        if len(self._conversation_history) > self._max_history:
-            self._conversation_history = self._conversation_history[-self._max_history:]
+        Queries that differ only in case or spacing share an entry. Cached
+        contexts are shared, not copied: callers must not mutate them.
+        """
+        ttl = settings.rag_retrieval_cache_ttl
+        if ttl <= 0:
+            return await self.retriever.retrieve(query=query, document_id=document_id)
+        
+        normalized = " ".join(query.casefold().split())
+        scope = f"{document_id or ''}|{self.retriever.strategy.model_dump_json()}"
+        key = hashlib.sha256(f"{scope}\0{normalized}".encode()).hexdigest()
+        
+        entry = self._retrieval_cache.get(key)
+        if entry is not None:
+            expires_at, _, context = entry
+            if time.monotonic() < expires_at:
+                self._retrieval_cache.move_to_end(key)
+                return context
+            del self._retrieval_cache[key]
+        
+        context = await self.retriever.retrieve(query=query, document_id=document_id)
+        self._retrieval_cache[key] = (time.monotonic() + ttl, document_id, context)
+        self._retrieval_cache.move_to_end(key)
+        while len(self._retrieval_cache) > self.MAX_CACHED_RETRIEVALS:
+            self._retrieval_cache.popitem(last=False)
+        return context
+    
+    def _reuse_answer(
+        self,
+        response: RAGResponse,
+        question: str,
+        start_time: float,
+    ) -> RAGResponse:
+        """Return a cached or shared response as the answer to this question."""
+        self._add_to_history(
+            question=question,
+            answer=response.answer,
+            sources=response.sources,
+        )
+        return replace(
+            response,
+            question=question,
+            retrieval_time_ms=0.0,
+            generation_time_ms=0.0,
+            total_time_ms=(time.perf_counter() - start_time) * 1000,
+        )
+    
+    def clear_answer_cache(self) -> None:
+        """Drop cached answers, e.g. after the graph has changed."""
+        self._answer_cache.clear()
+    
+    def invalidate_document(self, document_id: Optional[str] = None) -> None:
+        """
+        Drop cached results that a change to a document may have affected.
+        
+        Args:
+            document_id: Document that was added, updated or removed; None
+                when the change is not tied to one document (clears all)
+        """
+        if document_id is None:
+            self._retrieval_cache.clear()
+        else:
+            # Unscoped queries search across every document
+            stale = [
+                key for key, (_, cached_document_id, _) in self._retrieval_cache.items()
+                if cached_document_id in (document_id, None)
+            ]
+            for key in stale:
+                del self._retrieval_cache[key]
+        self.clear_answer_cache()
     
     def clear_history(self) -> None:
         """Clear conversation history."""
-        self._conversation_history = []
+        self._conversation_history.clear()
     
     def get_history(self) -> list[dict]:
         """Get conversation history as dicts."""
@@ -387,7 +733,7 @@ Current question: {question}"""
             {
                 "question": turn.question,
                 "answer": turn.answer,
-                "timestamp": turn.timestamp.isoformat(),
+                "timestamp": datetime.fromtimestamp(turn.timestamp).isoformat(),
             }
             for turn in self._conversation_history
         ]
@@ -10,10 +10,15 @@ Retrieves relevant context from the knowledge graph using multiple signals:
 Behavior is controlled by the RetrievalStrategy.
 """
 
+import asyncio
 import logging
+import time
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
+import orjson
+
 from app.core.neo4j_client import Neo4jClient, get_neo4j_client
 from app.core.llm import LLMClient, get_llm_client
 from app.schema.loader import get_schema_loader
@@ -23,6 +28,11 @@ from app.strategies import get_strategy_manager, RetrievalStrategy
 logger = logging.getLogger(__name__)
 
 
+def _cypher_identifier(name: str) -> str:
+    """Backtick-quote a label or property name for use in Cypher text."""
+    return "`" + str(name).replace("`", "``") + "`"
+
+
 # =============================================================================
 # QUERY DECOMPOSITION PROMPT
 # =============================================================================
@@ -52,6 +62,11 @@ Return a JSON object:
 }}"""
 
 
+# Entity fields shown first when formatting context, in this order
+PRIORITY_FIELDS = ("name", "title", "description", "summary", "text", "type", "value")
+_PRIORITY_SET = frozenset(PRIORITY_FIELDS)
+
+
 @dataclass
 class RetrievalResult:
     """A single retrieval result with score."""
@@ -99,10 +114,21 @@ class RetrievalContext:
     
     @property
     def is_empty(self) -> bool:
-        return len(self.entities) == 0 and len(self.chunks) == 0
+        return not self.entities and not self.chunks
     
     def to_debug_dict(self) -> dict[str, Any]:
         """Convert retrieval context to debug dictionary."""
+        debug_chunks = []
+        for c in self.chunks[:10]:
+            text = c.get("text", "")
+            debug_chunks.append({
+                "id": c.get("id"),
+                "text": text[:300] + "..." if len(text) > 300 else text,
+                "page_number": c.get("page_number"),
+                "section_heading": c.get("section_heading"),
+                "key_terms": c.get("key_terms", [])[:10],
+            })
+        
         return {
             "query_analysis": self.query_plan,
             "cypher_queries": [
@@ -117,18 +143,9 @@ class RetrievalContext:
             ],
             "retrieval_results": {
                 "entities": self.entities[:20],  # Limit for response size
-                "chunks": [
-                    {
-                        "id": c.get("id"),
-                        "text": c.get("text", "")[:300] + "..." if len(c.get("text", "")) > 300 else c.get("text", ""),
-                        "page_number": c.get("page_number"),
-                        "section_heading": c.get("section_heading"),
-                        "key_terms": c.get("key_terms", [])[:10],
-                    }
-                    for c in self.chunks[:10]
-                ],
-                "entity_count": len(self.entities),
-                "chunk_count": len(self.chunks),
+                "chunks": debug_chunks,
+                "entity_count": self.entity_count,
+                "chunk_count": self.chunk_count,
             },
             "search_methods_used": self.search_methods_used,
         }
@@ -150,6 +167,9 @@ class GraphRetriever:
         print(context.raw_text)
     """
     
+    # Query analyses kept for repeated questions (LRU)
+    MAX_CACHED_ANALYSES = 512
+    
     def __init__(
         self,
         graph_repo: Optional[DynamicGraphRepository] = None,
@@ -170,6 +190,9 @@ class GraphRetriever:
         except Exception as e:
             logger.debug(f"Could not load schema entity types, using default: {e}")
             self.entity_types = ["Entity"]
+        
+        # Normalized query -> LLM query analysis
+        self._analysis_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
     
     async def retrieve(
         self,
@@ -287,7 +310,19 @@ class GraphRetriever:
         )
     
     async def _analyze_query(self, query: str) -> dict[str, Any]:
-        """Analyze query to determine retrieval strategy."""
+        """
+        Analyze query to determine retrieval strategy.
+        
+        LLM analyses are reused for queries that differ only in case or
+        spacing. A query carrying conversation history only matches the
+        same exchange, since the history is part of the text.
+        """
+        cache_key = " ".join(query.casefold().split())
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(cache_key)
+            return cached
+        
         try:
             prompt = QUERY_DECOMPOSITION_PROMPT.format(
                 query=query,
@@ -295,16 +330,10 @@ class GraphRetriever:
             )
             response = await self.llm.complete(prompt)
             
-            # Parse JSON response
-            import json
-            cleaned = response.strip()
-            if cleaned.startswith("```"):
-                cleaned = cleaned.split("```")[1]
-                if cleaned.startswith("json"):
-                    cleaned = cleaned[4:]
-            cleaned = cleaned.strip()
-            
-            return json.loads(cleaned)
+            # Parse the JSON object, skipping any code fence or prose around it
+            start = response.find("{")
+            end = response.rfind("}") + 1
+            analysis = orjson.loads(response[start:end] if start != -1 and end > start else response)
         except Exception as e:
             logger.warning(f"Query analysis failed: {e}")
             # Return default analysis with keywords extracted
@@ -320,6 +349,12 @@ class GraphRetriever:
                 "filters": {},
                 "search_text": query,
             }
+        
+        # Only successful analyses are cached; a failed call is retried next time
+        self._analysis_cache[cache_key] = analysis
+        while len(self._analysis_cache) > self.MAX_CACHED_ANALYSES:
+            self._analysis_cache.popitem(last=False)
+        return analysis
     
     async def _retrieve_via_graph(
         self,
@@ -327,7 +362,6 @@ class GraphRetriever:
         document_id: Optional[str],
     ) -> tuple[list[RetrievalResult], list[CypherQuery]]:
         """Retrieve via graph traversal."""
-        import time
         results = []
         queries = []
         entity_types = query_analysis.get("entity_types", self.entity_types[:3])
@@ -336,58 +370,27 @@ class GraphRetriever:
         
         await self.neo4j.connect()
         
-        # Search each relevant entity type
-        for entity_type in entity_types:
-            if filters:
-                # Search with filters
-                where_parts = []
-                params = {"limit": self.strategy.limits.max_entities}
-                
-                for key, value in filters.items():
-                    param_name = f"filter_{key}"
-                    where_parts.append(f"toLower(toString(n.{key})) CONTAINS toLower(${param_name})")
-                    params[param_name] = str(value)
-                
-                where_clause = " AND ".join(where_parts)
-                query = f"""
-                MATCH (n:{entity_type})
-                WHERE {where_clause}
-                RETURN n
-                LIMIT $limit
-                """
-            else:
-                query = f"""
-                MATCH (n:{entity_type})
-                RETURN n
-                LIMIT $limit
-                """
-                params = {"limit": self.strategy.limits.max_entities}
-            
+        # Search all relevant entity types in one round trip; if the fused
+        # query fails, search each type on its own so one bad label only
+        # loses its own results
+        entity_types = list(dict.fromkeys(entity_types))
+        if entity_types:
             try:
-                start_time = time.time()
-                query_results = await self.neo4j.execute_query(query, params)
-                exec_time = (time.time() - start_time) * 1000
-                
-                # Track this query
-                queries.append(CypherQuery(
-                    description=f"Get {entity_type} entities",
-                    query=query.strip(),
-                    params=params,
-                    result_count=len(query_results),
-                    execution_time_ms=exec_time,
-                ))
-                
-                for r in query_results:
-                    entity = dict(r["n"])
-                    entity["_type"] = entity_type
-                    results.append(RetrievalResult(
-                        source="graph",
-                        item=entity,
-                        score=self.strategy.scoring.graph_match_weight,
-                        item_type="entity",
-                    ))
+                # The fused query also expands one hop in the same round trip
+                type_results, type_query = await self._search_entity_types_batch(
+                    entity_types, filters, expand=max_depth > 1
+                )
+                return type_results, [type_query]
             except Exception as e:
-                logger.debug(f"Graph query failed for {entity_type}: {e}")
+                logger.debug(f"Fused graph query failed, searching per type: {e}")
+                type_searches = await asyncio.gather(*[
+                    self._search_entity_type(entity_type, filters)
+                    for entity_type in entity_types
+                ])
+                for type_results, type_query in type_searches:
+                    results.extend(type_results)
+                    if type_query:
+                        queries.append(type_query)
         
         # Expand context via relationships if we have results
         if results and max_depth > 1:
@@ -399,11 +402,168 @@ class GraphRetriever:
         
         return results, queries
     
+    def _entity_filter_clause(self, filters: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        """
+        Build a WHERE clause matching entity properties against filters.
+        
+        Returns:
+            Tuple of (clause, params); the clause is empty without filters
+        """
+        where_parts = []
+        params = {}
+        for index, (key, value) in enumerate(filters.items()):
+            param_name = f"filter_{index}"
+            where_parts.append(
+                f"toLower(toString(n.{_cypher_identifier(key)})) CONTAINS toLower(${param_name})"
+            )
+            params[param_name] = str(value)
+        
+        if not where_parts:
+            return "", params
+        return "WHERE " + " AND ".join(where_parts), params
+    
+    async def _search_entity_types_batch(
+        self,
+        entity_types: list[str],
+        filters: dict[str, Any],
+        expand: bool = False,
+    ) -> tuple[list[RetrievalResult], CypherQuery]:
+        """
+        Search several entity types with a single UNION ALL query.
+        
+        Each type keeps its own LIMIT, so results match running one query
+        per type. With expand, the same query also collects the entities
+        one relationship away from the matches (as _expand_graph_context
+        does), so seeds and neighbours arrive in one round trip.
+        Raises if the query fails.
+        
+        Returns:
+            Tuple of (results, tracked query)
+        """
+        where_clause, params = self._entity_filter_clause(filters)
+        params["limit"] = self.strategy.limits.max_entities
+        if expand:
+            params["confidence_min"] = self.strategy.scoring.entity_confidence_min
+        
+        type_query = "\nUNION ALL\n".join(
+            f"""
+            MATCH (n:{_cypher_identifier(entity_type)}) {where_clause}
+            RETURN n, {index} AS type_index
+            LIMIT $limit
+            """
+            for index, entity_type in enumerate(entity_types)
+        )
+        if expand:
+            query = f"""
+            CALL {{
+            {type_query}
+            }}
+            WITH collect(n) AS nodes, collect({{n: n, type_index: type_index}}) AS seeds
+            CALL {{
+                WITH nodes
+                UNWIND nodes AS n
+                WITH n WHERE n.id IS NOT NULL
+                OPTIONAL MATCH (n)-[]-(related)
+                WHERE NOT 'Chunk' IN labels(related) AND NOT 'Document' IN labels(related)
+                  AND coalesce(related.confidence, 1.0) >= $confidence_min
+                RETURN collect(DISTINCT related)[..$limit] AS related
+            }}
+            RETURN seeds, related
+            """
+        else:
+            query = type_query
+        
+        start_time = time.perf_counter()
+        query_results = await self.neo4j.execute_query(query, params)
+        exec_time = (time.perf_counter() - start_time) * 1000
+        
+        if expand:
+            seeds = query_results[0]["seeds"] if query_results else []
+            related = query_results[0]["related"] if query_results else []
+        else:
+            seeds, related = query_results, []
+        
+        results = []
+        for r in seeds:
+            entity = dict(r["n"])
+            entity["_type"] = entity_types[r["type_index"]]
+            results.append(RetrievalResult(
+                source="graph",
+                item=entity,
+                score=self.strategy.scoring.graph_match_weight,
+                item_type="entity",
+            ))
+        for entity in related:
+            if entity:
+                results.append(RetrievalResult(
+                    source="graph",
+                    item=dict(entity),
+                    score=self.strategy.scoring.graph_match_weight * 0.8,  # Lower for expanded
+                    item_type="entity",
+                ))
+        
+        description = f"Get {', '.join(entity_types)} entities"
+        if expand:
+            description += " and related entities"
+        return results, CypherQuery(
+            description=description,
+            query=query.strip(),
+            params=params,
+            result_count=len(results),
+            execution_time_ms=exec_time,
+        )
+    
+    async def _search_entity_type(
+        self,
+        entity_type: str,
+        filters: dict[str, Any],
+    ) -> tuple[list[RetrievalResult], Optional[CypherQuery]]:
+        """
+        Search one entity type, optionally filtered by property values.
+        
+        Returns:
+            Tuple of (results, tracked query); the query is None if it failed
+        """
+        where_clause, params = self._entity_filter_clause(filters)
+        params["limit"] = self.strategy.limits.max_entities
+        query = f"""
+        MATCH (n:{_cypher_identifier(entity_type)}) {where_clause}
+        RETURN n
+        LIMIT $limit
+        """
+        
+        try:
+            start_time = time.perf_counter()
+            query_results = await self.neo4j.execute_query(query, params)
+            exec_time = (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            logger.debug(f"Graph query failed for {entity_type}: {e}")
+            return [], None
+        
+        results = []
+        for r in query_results:
+            entity = dict(r["n"])
+            entity["_type"] = entity_type
+            results.append(RetrievalResult(
+                source="graph",
+                item=entity,
+                score=self.strategy.scoring.graph_match_weight,
+                item_type="entity",
+            ))
+        
+        # Track this query
+        return results, CypherQuery(
+            description=f"Get {entity_type} entities",
+            query=query.strip(),
+            params=params,
+            result_count=len(query_results),
+            execution_time_ms=exec_time,
+        )
+    
     async def _expand_graph_context(
         self, entity_ids: list[str]
     ) -> tuple[list[RetrievalResult], list[CypherQuery]]:
         """Expand context by following relationships."""
-        import time
         results = []
         queries = []
         
@@ -412,19 +572,26 @@ class GraphRetriever:
         WHERE n.id IN $ids
         OPTIONAL MATCH (n)-[r]-(related)
         WHERE NOT 'Chunk' IN labels(related) AND NOT 'Document' IN labels(related)
-        RETURN collect(DISTINCT related) as entities,
+          AND coalesce(related.confidence, 1.0) >= $confidence_min
+        RETURN collect(DISTINCT related)[..$limit] as entities,
                collect(DISTINCT {
                    source: startNode(r).id,
                    target: endNode(r).id,
                    type: type(r)
-               }) as relationships
+               })[..$limit] as relationships
         """
-        params = {"ids": entity_ids}
+        # Apply the confidence filter before the cap, so the cap never
+        # drops a neighbour that would have survived _process_results
+        params = {
+            "ids": entity_ids,
+            "limit": self.strategy.limits.max_entities,
+            "confidence_min": self.strategy.scoring.entity_confidence_min,
+        }
         
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
             query_results = await self.neo4j.execute_query(query, params)
-            exec_time = (time.time() - start_time) * 1000
+            exec_time = (time.perf_counter() - start_time) * 1000
             
             entity_count = 0
             if query_results:
@@ -465,6 +632,12 @@ class GraphRetriever:
         # Combine search text and keywords
         search_terms = [search_text] + keywords[:3]
         
+        # The full-text index matches any of the words, ranked by relevance,
+        # so all terms go into one lookup instead of one scan per term
+        method = self.strategy.search.chunk_text_search.method
+        if method == "fulltext":
+            search_terms = [" ".join(term for term in search_terms if term)]
+        
         for term in search_terms:
             if not term:
                 continue
@@ -475,6 +648,7 @@ class GraphRetriever:
                     document_id=document_id,
                     limit=self.strategy.limits.max_chunks // 2,
                     return_query=True,
+                    method=method,
                 )
                 
                 if cypher_info:
@@ -671,18 +845,16 @@ class GraphRetriever:
         if entities:
             parts.append("\n## Extracted Entities\n")
             
-            # Group entities by type
-            entities_by_type: dict[str, list] = {}
+            # Group entities by type (the fallback lookup only runs when needed)
+            entities_by_type: defaultdict[str, list] = defaultdict(list)
             for entity in entities:
-                entity_type = entity.get("_type", entity.get("entity_type", "Entity"))
-                if entity_type not in entities_by_type:
-                    entities_by_type[entity_type] = []
+                entity_type = entity["_type"] if "_type" in entity else entity.get("entity_type", "Entity")
                 entities_by_type[entity_type].append(entity)
             
             for entity_type, type_entities in entities_by_type.items():
                 parts.append(f"\n### {entity_type}s\n")
                 for entity in type_entities:
-                    parts.append(self._format_entity(entity))
+                    self._format_entity(entity, parts)
         
         # Format relationships
         if relationships:
@@ -695,15 +867,19 @@ class GraphRetriever:
         
         return "\n".join(parts)
     
-    def _format_entity(self, entity: dict[str, Any]) -> str:
-        """Format a single entity as text."""
-        priority_fields = ["name", "title", "description", "summary", "text", "type", "value"]
+    def _format_entity(self, entity: dict[str, Any], out: list[str]) -> None:
+        """
+        Format a single entity as text.
         
-        all_fields = list(entity.keys())
-        fields = [f for f in priority_fields if f in all_fields]
-        fields.extend([f for f in all_fields if f not in fields and not f.startswith("_")])
+        Args:
+            entity: Entity properties
+            out: Context lines to append to; a trailing empty line
+                separates the entity from the next one
+        """
+        fields = [f for f in PRIORITY_FIELDS if f in entity]
+        fields.extend(f for f in entity if f not in _PRIORITY_SET and not f.startswith("_"))
         
-        lines = [f"**{entity.get('name', entity.get('title', entity.get('id', 'Entity')))}**"]
+        out.append(f"**{entity.get('name', entity.get('title', entity.get('id', 'Entity')))}**")
         
         for field in fields[:10]:  # Limit fields shown
             if field in entity and entity[field]:
@@ -712,9 +888,9 @@ class GraphRetriever:
                     value = ", ".join(str(v) for v in value[:5])
                 elif isinstance(value, str) and len(value) > 200:
                     value = value[:200] + "..."
-                lines.append(f"  - {field}: {value}")
+                out.append(f"  - {field}: {value}")
         
-        return "\n".join(lines) + "\n"
+        out.append("")
     
     # ==========================================================================
     # CONVENIENCE METHODS
@@ -735,8 +911,10 @@ class GraphRetriever:
     ) -> RetrievalContext:
         """Retrieve all context for a specific document."""
         if self.graph_repo:
-            chunks = await self.graph_repo.get_chunks_for_document(document_id)
-            graph_data = await self.graph_repo.get_graph_for_document(document_id)
+            chunks, graph_data = await asyncio.gather(
+                self.graph_repo.get_chunks_for_document(document_id),
+                self.graph_repo.get_graph_for_document(document_id),
+            )
             
             return RetrievalContext(
                 entities=graph_data.get("entities", []),
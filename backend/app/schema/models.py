@@ -192,6 +192,14 @@ class DynamicEntity(BaseModel):
     source_text: Optional[str] = Field(default=None)
     metadata: dict[str, Any] = Field(default_factory=dict)
     
+    # Chunk the entity was extracted from (set when merged into a document graph)
+    source_chunk_id: Optional[str] = Field(default=None)
+    source_chunk_index: Optional[int] = Field(default=None)
+    
+    # Document the entity was extracted from (set when added to a graph);
+    # stored on the node so a document's entities can be found again
+    source_document: Optional[str] = Field(default=None)
+    
     def get(self, property_name: str, default: Any = None) -> Any:
         """Get a property value."""
         return self.properties.get(property_name, default)
@@ -216,6 +224,8 @@ class DynamicEntity(BaseModel):
             "confidence": self.confidence,
             **self.properties,
         }
+        if self.source_document is not None:
+            props["source_document"] = self.source_document
         # Convert complex types
         for key, value in props.items():
             if isinstance(value, (list, dict)):
@@ -267,28 +277,79 @@ class DynamicGraph(BaseModel):
     
     model_config = {"arbitrary_types_allowed": True}
     
-    def add_entity(self, entity: DynamicEntity) -> None:
+    def add_entity(self, entity: DynamicEntity) -> bool:
         """
         Add an entity to the graph, deduplicating by ID.
         
         If an entity with the same ID exists, it's skipped (keeps first occurrence).
+        
+        Returns:
+            True if the entity was added, False if it was a duplicate
         """
         self._raw_entity_count += 1
         
         # Skip if we already have this entity
         if entity.id in self._entity_ids:
-            return
+            return False
         
         self._entity_ids.add(entity.id)
+        entity.source_document = self.source_document
         
         if entity.entity_type not in self.entities:
             self.entities[entity.entity_type] = []
         self.entities[entity.entity_type].append(entity)
+        return True
+    
+    def extend_entities(
+        self,
+        entities: list[DynamicEntity],
+        chunk_id: str,
+        chunk_index: int,
+    ) -> list[DynamicEntity]:
+        """
+        Add entities extracted from one chunk, tagging them with their source.
+        
+        Bulk version of add_entity for merging chunk results: sets
+        source_chunk_id/source_chunk_index (and source_document) on every
+        entity and deduplicates
+        by ID in a single pass.
+        
+        Args:
+            entities: Entities extracted from the chunk
+            chunk_id: ID of the source chunk
+            chunk_index: Index of the source chunk
+            
+        Returns:
+            The entities that were added (duplicates excluded)
+        """
+        seen = self._entity_ids
+        added = []
+        
+        for entity in entities:
+            entity.source_chunk_id = chunk_id
+            entity.source_chunk_index = chunk_index
+            entity.source_document = self.source_document
+            if entity.id in seen:
+                continue
+            seen.add(entity.id)
+            self.entities.setdefault(entity.entity_type, []).append(entity)
+            added.append(entity)
+        
+        self._raw_entity_count += len(entities)
+        return added
     
     def add_relationship(self, relationship: DynamicRelationship) -> None:
         """Add a relationship to the graph."""
         self.relationships.append(relationship)
     
+    def extend_relationships(self, relationships: list[DynamicRelationship]) -> None:
+        """Add several relationships to the graph."""
+        self.relationships.extend(relationships)
+    
+    def has_entity(self, entity_id: str) -> bool:
+        """Check whether an entity with this ID has been added."""
+        return entity_id in self._entity_ids
+    
     def get_entities_by_type(self, entity_type: str) -> list[DynamicEntity]:
         """Get all entities of a specific type."""
         return self.entities.get(entity_type, [])
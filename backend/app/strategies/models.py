@@ -147,6 +147,19 @@ class EntityLinkingConfig(BaseModel):
     )
 
 
+class ExtractionCacheConfig(BaseModel):
+    """Configuration for reusing extraction results across identical chunks."""
+    
+    enabled: bool = Field(
+        default=True,
+        description="Reuse extraction results for chunks with identical text"
+    )
+    normalize_whitespace: bool = Field(
+        default=True,
+        description="Treat chunks differing only in whitespace/line breaks as identical"
+    )
+
+
 class ValidationConfig(BaseModel):
     """Configuration for schema validation behavior."""
     
@@ -234,6 +247,22 @@ class ExtractionStrategy(BaseModel):
         default_factory=ValidationConfig,
         description="Schema validation settings"
     )
+    cache: ExtractionCacheConfig = Field(
+        default_factory=ExtractionCacheConfig,
+        description="Extraction result reuse settings"
+    )
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=64,
+        description="Max concurrent chunk extraction (LLM) calls; None uses the pipeline default"
+    )
+    batch_size: int = Field(
+        default=1,
+        ge=1,
+        le=16,
+        description="Chunks sent per extraction (LLM) call; >1 shares one prompt across chunks"
+    )
 
 
 # =============================================================================
@@ -325,6 +354,10 @@ class NeighborExpansionConfig(BaseModel):
         le=5,
         description="Number of chunks to include after"
     )
+    mode: Literal["window", "section"] = Field(
+        default="window",
+        description="window: plain before/after chunks; section: neighbors from the same section only, plus the chunk that opens the section"
+    )
 
 
 class IncludeMetadataConfig(BaseModel):
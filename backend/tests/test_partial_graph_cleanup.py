@@ -0,0 +1,110 @@
+"""Cleanup of entities written by a failed streamed ingest."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.graph.dynamic_repository import DynamicGraphRepository
+from app.ingestion.pipeline import IngestionPipeline, IngestionStatus
+from app.schema.models import DynamicEntity, DynamicGraph
+
+
+class StubClient:
+    """Records write queries instead of sending them to Neo4j."""
+
+    def __init__(self):
+        self.writes: list[tuple[str, dict]] = []
+
+    async def execute_write(self, query, parameters=None, database="neo4j"):
+        self.writes.append((query, parameters or {}))
+        return {}
+
+
+def _merged_entities(source_document: str) -> list[DynamicEntity]:
+    graph = DynamicGraph(schema_name="test", source_document=source_document)
+    return graph.extend_entities(
+        [
+            DynamicEntity(id="party_acme", entity_type="Party", properties={"name": "Acme"}),
+            DynamicEntity(id="party_beta", entity_type="Party", properties={"name": "Beta"}),
+            DynamicEntity(id="clause_1", entity_type="Clause"),
+        ],
+        chunk_id="chunk_0",
+        chunk_index=0,
+    )
+
+
+def test_merged_entities_store_their_source_document():
+    for entity in _merged_entities("contract.pdf"):
+        assert entity.to_neo4j_properties()["source_document"] == "contract.pdf"
+
+
+def test_delete_entities_matches_the_stored_source_document():
+    client = StubClient()
+    repo = DynamicGraphRepository(client=client, schema_loader=object())
+
+    deleted = asyncio.run(repo.delete_entities(_merged_entities("contract.pdf")))
+
+    assert deleted == 3
+    assert len(client.writes) == 2  # one query per entity type
+    rows_by_label = {}
+    for query, params in client.writes:
+        assert "DETACH DELETE n" in query
+        assert "n.source_document = row.source_document" in query
+        label = query.split("MATCH (n:")[1].split(" ")[0]
+        rows_by_label[label] = params["rows"]
+    assert rows_by_label == {
+        "Party": [
+            {"id": "party_acme", "source_document": "contract.pdf"},
+            {"id": "party_beta", "source_document": "contract.pdf"},
+        ],
+        "Clause": [{"id": "clause_1", "source_document": "contract.pdf"}],
+    }
+
+
+def test_delete_entities_skips_entities_without_provenance():
+    client = StubClient()
+    repo = DynamicGraphRepository(client=client, schema_loader=object())
+
+    asyncio.run(repo.delete_entities([DynamicEntity(id="orphan", entity_type="Party")]))
+
+    assert client.writes == []
+
+
+class FailingCleanupRepo:
+    """Accepts entity writes, then fails to delete them."""
+
+    async def create_entities(self, entities):
+        return len(entities)
+
+    async def store_relationships(self, relationships):
+        return len(relationships)
+
+    async def delete_entities(self, entities):
+        raise ConnectionError("neo4j unavailable")
+
+
+def test_failed_cleanup_is_recorded_on_the_status():
+    pipeline = IngestionPipeline.__new__(IngestionPipeline)
+    pipeline.graph_repo = FailingCleanupRepo()
+
+    async def failing_extraction(chunks, source_document, status, entity_sink=None):
+        for entity in _merged_entities(source_document):
+            await entity_sink.put(entity)
+        await asyncio.sleep(0.01)  # let the writer take the batch
+        raise ValueError("extraction failed")
+
+    pipeline._extract_from_chunks = failing_extraction
+    status = IngestionStatus(
+        document_id="doc_1",
+        filename="contract.pdf",
+        status="extracting",
+        started_at=datetime.now(timezone.utc),
+    )
+
+    with pytest.raises(ValueError, match="extraction failed"):
+        asyncio.run(pipeline._extract_streaming([], "contract.pdf", status))
+
+    assert "3 entities" in status.cleanup_error
+    assert "neo4j unavailable" in status.cleanup_error
+    assert status.to_dict()["cleanup_error"] == status.cleanup_error